@@ -0,0 +1,4 @@
+-- 血統関係の重複登録を防ぐユニークインデックス
+-- insert_horse_relations の INSERT ... ON CONFLICT (horse_a_id, horse_b_id, relation_type) DO NOTHING が前提とする
+CREATE UNIQUE INDEX IF NOT EXISTS horse_relations_uniq
+    ON horse_relations (horse_a_id, horse_b_id, relation_type);
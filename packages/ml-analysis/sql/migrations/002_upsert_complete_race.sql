@@ -0,0 +1,57 @@
+-- 1レース分の情報・出走馬・結果を1回の呼び出しで登録する関数
+-- PostgreSQLStorage.insert_complete_race_data から呼ばれる（未作成の場合は従来の複数文での登録にフォールバック）
+-- Supabase からは 007 の upsert_complete_race_supabase を使う
+-- race: races の1行分のJSONオブジェクト / results: race_results の行のJSON配列
+CREATE OR REPLACE FUNCTION upsert_complete_race(race jsonb, results jsonb)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO races (
+        race_id, race_date, track_name, race_number, race_name,
+        distance, track_type, total_horses, grade, track_direction,
+        weather, track_condition, start_time, winning_time, pace,
+        prize_1st, race_class, race_conditions, created_at, updated_at
+    )
+    SELECT
+        race_id, race_date, track_name, race_number, race_name,
+        distance, track_type, total_horses, grade, track_direction,
+        weather, track_condition, start_time, winning_time, pace,
+        prize_1st, race_class, race_conditions, created_at, updated_at
+    FROM jsonb_populate_record(NULL::races, race)
+    ON CONFLICT (race_id) DO UPDATE SET
+        updated_at = EXCLUDED.updated_at;
+
+    INSERT INTO horses (id, name_ja, created_at, updated_at)
+    SELECT DISTINCT ON (r.horse_id) r.horse_id, r.horse_name, r.created_at, r.updated_at
+    FROM jsonb_populate_recordset(NULL::race_results, results) AS r
+    ORDER BY r.horse_id
+    ON CONFLICT (id) DO NOTHING;
+
+    INSERT INTO race_results (
+        race_id, horse_id, horse_name, bracket_number, horse_number,
+        age, sex, jockey_weight, jockey_name, trainer_name,
+        finish_position, jockey_id, trainer_region, trainer_id,
+        race_time, time_diff, passing_order, last_3f, odds,
+        popularity, horse_weight, weight_change, prize_money,
+        owner_id, owner_name, created_at, updated_at
+    )
+    SELECT DISTINCT ON (r.race_id, r.horse_id)
+        r.race_id, r.horse_id, r.horse_name, r.bracket_number, r.horse_number,
+        r.age, r.sex, r.jockey_weight, r.jockey_name, r.trainer_name,
+        r.finish_position, r.jockey_id, r.trainer_region, r.trainer_id,
+        r.race_time, r.time_diff, r.passing_order, r.last_3f, r.odds,
+        r.popularity, r.horse_weight, r.weight_change, r.prize_money,
+        r.owner_id, r.owner_name, r.created_at, r.updated_at
+    FROM jsonb_populate_recordset(NULL::race_results, results) AS r
+    ORDER BY r.race_id, r.horse_id
+    ON CONFLICT (race_id, horse_id) DO UPDATE SET
+        updated_at = EXCLUDED.updated_at,
+        finish_position = EXCLUDED.finish_position,
+        race_time = EXCLUDED.race_time,
+        odds = EXCLUDED.odds,
+        popularity = EXCLUDED.popularity,
+        horse_weight = EXCLUDED.horse_weight,
+        weight_change = EXCLUDED.weight_change;
+END;
+$$;
@@ -0,0 +1,7 @@
+-- 馬ごとの出走成績の参照（race_results.horse_id での検索・結合）用インデックス
+-- CONCURRENTLY はトランザクションブロック内では実行できないため、psql などで1文ずつ実行する
+--
+-- race_results (race_id, horse_id)・race_payouts (race_id, bet_type, combination) の一意制約は
+-- 既存の ON CONFLICT が前提としているため作成済み、horse_relations の一意インデックスは 001 で作成する
+CREATE INDEX CONCURRENTLY IF NOT EXISTS race_results_horse_id
+    ON race_results (horse_id);
@@ -0,0 +1,28 @@
+-- レース統計（総レース数・総結果数・グレード別レース数・最新レース日）をサーバー側で集計して返す関数
+-- RaceStorage.get_statistics から RPC で呼ばれる（未作成の場合は従来のテーブルごとの取得にフォールバック）
+CREATE OR REPLACE FUNCTION get_race_stats()
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'total_races', r.total_races,
+        'total_results', (SELECT COUNT(*) FROM race_results),
+        'races_by_grade', COALESCE(
+            (
+                SELECT jsonb_object_agg(grade, races_count)
+                FROM (
+                    SELECT COALESCE(grade, 'Unknown') AS grade, COUNT(*) AS races_count
+                    FROM races
+                    GROUP BY 1
+                ) AS g
+            ),
+            '{}'::jsonb
+        ),
+        'latest_race_date', r.latest_race_date
+    )
+    FROM (
+        SELECT COUNT(*) AS total_races, MAX(race_date) AS latest_race_date
+        FROM races
+    ) AS r
+$$;
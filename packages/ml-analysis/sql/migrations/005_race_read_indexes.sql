@@ -0,0 +1,13 @@
+-- RaceStorage の読み取り用インデックス
+-- CONCURRENTLY はトランザクションブロック内では実行できないため、psql などで1文ずつ実行する
+--
+-- race_results (horse_id) は 003 で作成済み（get_horse_race_history）
+
+-- get_race_results: race_id で絞り finish_position 順に並べる（ソート不要になる）
+CREATE INDEX CONCURRENTLY IF NOT EXISTS race_results_race_finish
+    ON race_results (race_id, finish_position);
+
+-- get_races_by_date_range(grade=...): グレードの等価条件＋日付の範囲・降順
+-- （grade を先頭にすると、指定グレードの行だけを日付順に読める）
+CREATE INDEX CONCURRENTLY IF NOT EXISTS races_grade_date
+    ON races (grade, race_date DESC);
@@ -0,0 +1,9 @@
+-- get_races_by_date_range（グレード指定なし）用のカバリングインデックス
+-- CONCURRENTLY はトランザクションブロック内では実行できないため、psql などで1文ずつ実行する
+--
+-- columns= でここに含まれる列だけを指定すれば、テーブル本体を読まずにインデックスだけで返せる
+-- （例: 'race_id,race_date,race_name,grade,distance,track_name,track_type'）
+-- グレード指定ありの場合は 005 の races (grade, race_date DESC) を使う
+CREATE INDEX CONCURRENTLY IF NOT EXISTS races_date_covering
+    ON races (race_date DESC)
+    INCLUDE (race_id, race_name, grade, distance, track_name, track_type);
@@ -0,0 +1,91 @@
+-- Supabase用: 1レース分の情報・結果を1回の呼び出しで登録する関数
+-- RaceStorage.insert_complete_race_data から RPC で呼ばれる（未作成の場合は従来のテーブルごとのupsertにフォールバック）
+-- race: Race.to_dict() に created_at / updated_at を加えたJSONオブジェクト / results: RaceResult.to_dict() の配列
+--
+-- 002 の upsert_complete_race（ローカルDB用）と違い、テーブルへのupsertと同じく
+-- corner_positions / lap_data を含む全列を登録し、既存行も created_at 以外を上書きする
+CREATE OR REPLACE FUNCTION upsert_complete_race_supabase(race jsonb, results jsonb)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO races (
+        race_id, race_date, track_name, race_number, race_name,
+        distance, track_type, total_horses, grade, track_direction,
+        weather, track_condition, start_time, winning_time, pace,
+        prize_1st, race_class, race_conditions, corner_positions, lap_data,
+        created_at, updated_at
+    )
+    SELECT
+        race_id, race_date, track_name, race_number, race_name,
+        distance, track_type, total_horses, grade, track_direction,
+        weather, track_condition, start_time, winning_time, pace,
+        prize_1st, race_class, race_conditions, corner_positions, lap_data,
+        created_at, updated_at
+    FROM jsonb_populate_record(NULL::races, race)
+    ON CONFLICT (race_id) DO UPDATE SET
+        race_date = EXCLUDED.race_date,
+        track_name = EXCLUDED.track_name,
+        race_number = EXCLUDED.race_number,
+        race_name = EXCLUDED.race_name,
+        distance = EXCLUDED.distance,
+        track_type = EXCLUDED.track_type,
+        total_horses = EXCLUDED.total_horses,
+        grade = EXCLUDED.grade,
+        track_direction = EXCLUDED.track_direction,
+        weather = EXCLUDED.weather,
+        track_condition = EXCLUDED.track_condition,
+        start_time = EXCLUDED.start_time,
+        winning_time = EXCLUDED.winning_time,
+        pace = EXCLUDED.pace,
+        prize_1st = EXCLUDED.prize_1st,
+        race_class = EXCLUDED.race_class,
+        race_conditions = EXCLUDED.race_conditions,
+        corner_positions = EXCLUDED.corner_positions,
+        lap_data = EXCLUDED.lap_data,
+        updated_at = EXCLUDED.updated_at;
+
+    INSERT INTO race_results (
+        race_id, horse_id, horse_name, bracket_number, horse_number,
+        age, sex, jockey_weight, jockey_name, trainer_name,
+        finish_position, jockey_id, trainer_region, trainer_id,
+        race_time, time_diff, passing_order, last_3f, odds,
+        popularity, horse_weight, weight_change, prize_money,
+        owner_id, owner_name, created_at, updated_at
+    )
+    SELECT DISTINCT ON (r.race_id, r.horse_id)
+        r.race_id, r.horse_id, r.horse_name, r.bracket_number, r.horse_number,
+        r.age, r.sex, r.jockey_weight, r.jockey_name, r.trainer_name,
+        r.finish_position, r.jockey_id, r.trainer_region, r.trainer_id,
+        r.race_time, r.time_diff, r.passing_order, r.last_3f, r.odds,
+        r.popularity, r.horse_weight, r.weight_change, r.prize_money,
+        r.owner_id, r.owner_name, r.created_at, r.updated_at
+    FROM jsonb_populate_recordset(NULL::race_results, results) AS r
+    ORDER BY r.race_id, r.horse_id
+    ON CONFLICT (race_id, horse_id) DO UPDATE SET
+        horse_name = EXCLUDED.horse_name,
+        bracket_number = EXCLUDED.bracket_number,
+        horse_number = EXCLUDED.horse_number,
+        age = EXCLUDED.age,
+        sex = EXCLUDED.sex,
+        jockey_weight = EXCLUDED.jockey_weight,
+        jockey_name = EXCLUDED.jockey_name,
+        trainer_name = EXCLUDED.trainer_name,
+        finish_position = EXCLUDED.finish_position,
+        jockey_id = EXCLUDED.jockey_id,
+        trainer_region = EXCLUDED.trainer_region,
+        trainer_id = EXCLUDED.trainer_id,
+        race_time = EXCLUDED.race_time,
+        time_diff = EXCLUDED.time_diff,
+        passing_order = EXCLUDED.passing_order,
+        last_3f = EXCLUDED.last_3f,
+        odds = EXCLUDED.odds,
+        popularity = EXCLUDED.popularity,
+        horse_weight = EXCLUDED.horse_weight,
+        weight_change = EXCLUDED.weight_change,
+        prize_money = EXCLUDED.prize_money,
+        owner_id = EXCLUDED.owner_id,
+        owner_name = EXCLUDED.owner_name,
+        updated_at = EXCLUDED.updated_at;
+END;
+$$;
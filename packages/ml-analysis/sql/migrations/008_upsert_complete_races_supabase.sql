@@ -0,0 +1,107 @@
+-- Supabase用: 複数レースの情報・結果・払い戻しを1回の呼び出し（1トランザクション）で登録する関数
+-- RaceStorage.insert_complete_race_data_batch から RPC で呼ばれる（未作成の場合は従来のテーブルごとのupsertにフォールバック）
+-- races / results / payouts: Race / RaceResult / RacePayout の to_dict() に created_at / updated_at を加えた行のJSON配列
+--
+-- 007 の upsert_complete_race_supabase と同じく全列を登録し、既存行も created_at 以外を上書きする
+-- 同じキーの行が複数ある場合は配列の後ろの行を採用する（テーブルへのupsertと同じ）
+CREATE OR REPLACE FUNCTION upsert_complete_races_supabase(races jsonb, results jsonb, payouts jsonb)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO races (
+        race_id, race_date, track_name, race_number, race_name,
+        distance, track_type, total_horses, grade, track_direction,
+        weather, track_condition, start_time, winning_time, pace,
+        prize_1st, race_class, race_conditions, corner_positions, lap_data,
+        created_at, updated_at
+    )
+    SELECT DISTINCT ON (r.race_id)
+        r.race_id, r.race_date, r.track_name, r.race_number, r.race_name,
+        r.distance, r.track_type, r.total_horses, r.grade, r.track_direction,
+        r.weather, r.track_condition, r.start_time, r.winning_time, r.pace,
+        r.prize_1st, r.race_class, r.race_conditions, r.corner_positions, r.lap_data,
+        r.created_at, r.updated_at
+    FROM jsonb_array_elements(races) WITH ORDINALITY AS e(value, seq)
+    CROSS JOIN LATERAL jsonb_populate_record(NULL::races, e.value) AS r
+    ORDER BY r.race_id, e.seq DESC
+    ON CONFLICT (race_id) DO UPDATE SET
+        race_date = EXCLUDED.race_date,
+        track_name = EXCLUDED.track_name,
+        race_number = EXCLUDED.race_number,
+        race_name = EXCLUDED.race_name,
+        distance = EXCLUDED.distance,
+        track_type = EXCLUDED.track_type,
+        total_horses = EXCLUDED.total_horses,
+        grade = EXCLUDED.grade,
+        track_direction = EXCLUDED.track_direction,
+        weather = EXCLUDED.weather,
+        track_condition = EXCLUDED.track_condition,
+        start_time = EXCLUDED.start_time,
+        winning_time = EXCLUDED.winning_time,
+        pace = EXCLUDED.pace,
+        prize_1st = EXCLUDED.prize_1st,
+        race_class = EXCLUDED.race_class,
+        race_conditions = EXCLUDED.race_conditions,
+        corner_positions = EXCLUDED.corner_positions,
+        lap_data = EXCLUDED.lap_data,
+        updated_at = EXCLUDED.updated_at;
+
+    INSERT INTO race_results (
+        race_id, horse_id, horse_name, bracket_number, horse_number,
+        age, sex, jockey_weight, jockey_name, trainer_name,
+        finish_position, jockey_id, trainer_region, trainer_id,
+        race_time, time_diff, passing_order, last_3f, odds,
+        popularity, horse_weight, weight_change, prize_money,
+        owner_id, owner_name, created_at, updated_at
+    )
+    SELECT DISTINCT ON (r.race_id, r.horse_id)
+        r.race_id, r.horse_id, r.horse_name, r.bracket_number, r.horse_number,
+        r.age, r.sex, r.jockey_weight, r.jockey_name, r.trainer_name,
+        r.finish_position, r.jockey_id, r.trainer_region, r.trainer_id,
+        r.race_time, r.time_diff, r.passing_order, r.last_3f, r.odds,
+        r.popularity, r.horse_weight, r.weight_change, r.prize_money,
+        r.owner_id, r.owner_name, r.created_at, r.updated_at
+    FROM jsonb_array_elements(results) WITH ORDINALITY AS e(value, seq)
+    CROSS JOIN LATERAL jsonb_populate_record(NULL::race_results, e.value) AS r
+    ORDER BY r.race_id, r.horse_id, e.seq DESC
+    ON CONFLICT (race_id, horse_id) DO UPDATE SET
+        horse_name = EXCLUDED.horse_name,
+        bracket_number = EXCLUDED.bracket_number,
+        horse_number = EXCLUDED.horse_number,
+        age = EXCLUDED.age,
+        sex = EXCLUDED.sex,
+        jockey_weight = EXCLUDED.jockey_weight,
+        jockey_name = EXCLUDED.jockey_name,
+        trainer_name = EXCLUDED.trainer_name,
+        finish_position = EXCLUDED.finish_position,
+        jockey_id = EXCLUDED.jockey_id,
+        trainer_region = EXCLUDED.trainer_region,
+        trainer_id = EXCLUDED.trainer_id,
+        race_time = EXCLUDED.race_time,
+        time_diff = EXCLUDED.time_diff,
+        passing_order = EXCLUDED.passing_order,
+        last_3f = EXCLUDED.last_3f,
+        odds = EXCLUDED.odds,
+        popularity = EXCLUDED.popularity,
+        horse_weight = EXCLUDED.horse_weight,
+        weight_change = EXCLUDED.weight_change,
+        prize_money = EXCLUDED.prize_money,
+        owner_id = EXCLUDED.owner_id,
+        owner_name = EXCLUDED.owner_name,
+        updated_at = EXCLUDED.updated_at;
+
+    INSERT INTO race_payouts (
+        race_id, bet_type, combination, payout_amount, popularity, created_at, updated_at
+    )
+    SELECT DISTINCT ON (p.race_id, p.bet_type, p.combination)
+        p.race_id, p.bet_type, p.combination, p.payout_amount, p.popularity, p.created_at, p.updated_at
+    FROM jsonb_array_elements(payouts) WITH ORDINALITY AS e(value, seq)
+    CROSS JOIN LATERAL jsonb_populate_record(NULL::race_payouts, e.value) AS p
+    ORDER BY p.race_id, p.bet_type, p.combination, e.seq DESC
+    ON CONFLICT (race_id, bet_type, combination) DO UPDATE SET
+        payout_amount = EXCLUDED.payout_amount,
+        popularity = EXCLUDED.popularity,
+        updated_at = EXCLUDED.updated_at;
+END;
+$$;
@@ -59,10 +59,19 @@ class Trainer:
         return Decimal('0.0')
     
     def update_stats(self):
-        """統計情報を自動更新"""
-        self.win_rate = self.calculate_win_rate()
-        self.second_rate = self.calculate_second_rate()
-        self.show_rate = self.calculate_show_rate()
+        """統計情報を自動更新（3つの率を1回のチェックでまとめて計算）"""
+        total = self.total_races
+        if not total or total <= 0:
+            self.win_rate = self.second_rate = self.show_rate = Decimal('0.0')
+            return
+        
+        wins = self.wins or 0
+        second_count = wins + (self.seconds or 0)
+        show_count = second_count + (self.thirds or 0)
+        
+        self.win_rate = Decimal(str(round((wins / total) * 100, 2)))
+        self.second_rate = Decimal(str(round((second_count / total) * 100, 2)))
+        self.show_rate = Decimal(str(round((show_count / total) * 100, 2)))
     
     def to_dict(self) -> dict:
         """PostgreSQL挿入用の辞書に変換"""
@@ -5,7 +5,7 @@ src/scraping/extractors/race/race_detail_extractor.py
 
 import logging
 import re
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime, date, time
 from decimal import Decimal, InvalidOperation
 
@@ -18,19 +18,20 @@ logger = logging.getLogger(__name__)
 class RaceDetailExtractor:
     """レース詳細ページからレース情報と結果を抽出するクラス"""
     
-    def extract_race_detail(self, html: str, race_id: str) -> Optional[Tuple[Race, List[RaceResult], List[RacePayout]]]:
+    def extract_race_detail(self, html: Union[str, bytes], race_id: str) -> Optional[Tuple[Race, List[RaceResult], List[RacePayout]]]:
         """
         レース詳細ページのHTMLからレース情報、結果、払い戻しを抽出
         
         Args:
-            html: レース詳細ページのHTML
+            html: レース詳細ページのHTML（bytesの場合はEUC-JPとしてパーサー内でデコード）
             race_id: レースID
             
         Returns:
             Tuple[Race, List[RaceResult], List[RacePayout]]: レース基本情報、結果、払い戻しのタプル
         """
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            from_encoding = 'euc-jp' if isinstance(html, bytes) else None
+            soup = BeautifulSoup(html, 'html.parser', from_encoding=from_encoding)
             
             # レース基本情報を抽出
             race = self._extract_race_info(soup, race_id)
@@ -143,8 +144,8 @@ class RaceDetailExtractor:
                 elif caption_text == 'ラップタイム':
                     data['lap_data'] = self._extract_lap_data(table)
             
-            logger.debug(f"Corner/Lap data extraction: corners={data['corner_positions'] is not None}, "
-                        f"laps={data['lap_data'] is not None}")
+            logger.debug("Corner/Lap data extraction: corners=%s, laps=%s",
+                         data['corner_positions'] is not None, data['lap_data'] is not None)
             
             return data
             
@@ -176,7 +177,8 @@ class RaceDetailExtractor:
                     elif corner_name == '4コーナー':
                         corner_data['corner_4'] = position_data
             
-            logger.debug(f"Extracted corner positions: {list(corner_data.keys())}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Extracted corner positions: %s", list(corner_data))
             return corner_data if corner_data else None
             
         except Exception as e:
@@ -203,7 +205,8 @@ class RaceDetailExtractor:
                     elif data_type == 'ペース':
                         lap_data['pace_times'] = time_data
             
-            logger.debug(f"Extracted lap data: {list(lap_data.keys())}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Extracted lap data: %s", list(lap_data))
             return lap_data if lap_data else None
             
         except Exception as e:
@@ -5,7 +5,7 @@ src/scraping/extractors/race/race_list_extractor.py
 
 import logging
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
 
 from bs4 import BeautifulSoup
@@ -20,19 +20,20 @@ class RaceListExtractor:
 
     
     
-    def extract_race_list(self, html: str, detail = False) -> List[Dict[str, Any]]:
+    def extract_race_list(self, html: Union[str, bytes], detail = False) -> List[Dict[str, Any]]:
         """
         レース一覧ページのHTMLからレース情報を抽出
         
         Args:
-            html: レース一覧ページのHTML
+            html: レース一覧ページのHTML（bytesの場合はEUC-JPとしてパーサー内でデコード）
             
         Returns:
             List[Dict]: レース基本情報のリスト
         """
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            from_encoding = 'euc-jp' if isinstance(html, bytes) else None
+            soup = BeautifulSoup(html, 'html.parser', from_encoding=from_encoding)
             races = []
             
             # レース一覧テーブルを探す
@@ -1,36 +1,52 @@
 # src/scraping/scrapers/base_scraper.py
 
-import requests
 from bs4 import BeautifulSoup
 import time
-from typing import Optional
+from typing import Any, Dict, Optional
 from abc import ABC, abstractmethod
 
+try:
+    from ..utils.http_session import create_session
+    from ..utils.rate_limiter import RateLimiter
+except ImportError:
+    from utils.http_session import create_session
+    from utils.rate_limiter import RateLimiter
+
 class BaseScraper(ABC):
     """競馬スクレイピングの基底クラス"""
     
     def __init__(self, base_url: str = "https://db.netkeiba.com"):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        # keep-aliveで接続を再利用し、一時的なエラー（429/5xx・接続リセット）はバックオフ付きでリトライ
+        self.session = create_session()
+        
+        # サーバーが指定する待機時間（Retry-After等）を次のリクエストに反映
+        self.rate_limiter = RateLimiter()
     
-    def get_soup(self, url: str) -> Optional[BeautifulSoup]:
-        """URLからBeautifulSoupオブジェクトを取得"""
+    def get_content(self, url: str, params: Optional[Dict[str, Any]] = None,
+                    timeout: float = 15) -> Optional[bytes]:
+        """URLからレスポンス本文（未デコードのbytes）を取得"""
         try:
             # print(f"🔍 ページ取得: {url}")
-            response = self.session.get(url, timeout=15)
+            self.rate_limiter.wait()
+            response = self.session.get(url, params=params, timeout=timeout)
+            self.rate_limiter.update(response.headers)
             response.raise_for_status()
-            response.encoding = 'euc-jp'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            return soup
+            return response.content
             
         except Exception as e:
             print(f"❌ ページ取得エラー: {e}")
             return None
     
+    def get_soup(self, url: str) -> Optional[BeautifulSoup]:
+        """URLからBeautifulSoupオブジェクトを取得"""
+        content = self.get_content(url)
+        if content is None:
+            return None
+        
+        # デコードはlxml(libxml2)側に任せるため、bytesのまま渡す
+        return BeautifulSoup(content, 'lxml', from_encoding='euc-jp')
+    
     def sleep(self, seconds: int = 1):
         """リクエスト間隔制御"""
         time.sleep(seconds)
@@ -2,6 +2,7 @@
 
 import sys
 import os
+import threading
 from typing import Dict, Optional, Tuple, List
 
 # パスを追加
@@ -27,8 +28,11 @@ class HorseScraper(BaseScraper):
         self.pedigree_extractor = PedigreeExtractor()
         self.career_extractor = CareerExtractor()
         
-        # ストレージクラス
+        # ストレージクラス（Supabaseクライアントはプロセス内で共有され、スレッド間で共有して使える）
         self.storage = SupabaseStorage()
+        
+        # 複数スレッドでscrapeする場合に、同じ種付関係のchildren_idsの読み取り→更新が競合しないようにする
+        self._mating_lock = threading.Lock()
     
     def scrape(self, horse_id: str) -> bool:
         """馬の完全な情報を取得・保存"""
@@ -39,19 +43,21 @@ class HorseScraper(BaseScraper):
         if not horse_data:
             return False
         
-        # 2. 血統関係取得
+        # 2. 血統関係取得（セッションを直接使うので、ここでリクエスト間隔を制御する）
+        self.rate_limiter.wait()
         relations = self.pedigree_extractor.extract_relations_from_url(horse_id, self.session)
         
         # 3. 血統IDを馬データに追加
         pedigree_ids = self.pedigree_extractor.extract_pedigree_ids_from_relations(relations, horse_id)
         horse_data.update(pedigree_ids)
         
-        # 4. 種付関係を作成・更新（children_ids付き）
-        mating_relations = self.pedigree_extractor.create_mating_relations(pedigree_ids, horse_id, self.storage)
-        relations.extend(mating_relations)
-        
-        # 5. データ保存
-        success = self.storage.save_all(horse_data, relations)
+        with self._mating_lock:
+            # 4. 種付関係を作成・更新（children_ids付き）
+            mating_relations = self.pedigree_extractor.create_mating_relations(pedigree_ids, horse_id, self.storage)
+            relations.extend(mating_relations)
+            
+            # 5. データ保存（種付関係の更新と同じロックの中で行う）
+            success = self.storage.save_all(horse_data, relations)
         
         # print(f"{'✅' if success else '❌'} 完了: {horse_data.get('name_ja', 'Unknown')}")
         
@@ -5,10 +5,12 @@ src/scraping/scrapers/race_scraper.py
 
 import time
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Set
 from datetime import datetime, date
 from urllib.parse import urljoin
 import math
+from collections import deque
+from itertools import islice
 
 import requests
 from bs4 import BeautifulSoup
@@ -62,8 +64,8 @@ class RaceScraper(BaseScraper):
         """レース詳細をスクレイピング"""
         result = self.scrape_race_detail(race_id)
         if result:
-            race, results = result
-            return {'race': race, 'results': results, 'success': True}
+            race, results, payouts = result
+            return {'race': race, 'results': results, 'payouts': payouts, 'success': True}
         return {'success': False}
     
     def _scrape_year(self, year: int, **kwargs) -> Dict[str, Any]:
@@ -161,7 +163,7 @@ class RaceScraper(BaseScraper):
         }
         
         try:
-            logger.info(f"Fetching race list: {start_year}-{end_year}, grades: {grades}, limit: {limit}")
+            logger.info("Fetching race list: %s-%s, grades: %s, limit: %d", start_year, end_year, grades, limit)
             
             page = 1
             while len(all_races) < limit:
@@ -169,23 +171,22 @@ class RaceScraper(BaseScraper):
                 params = base_params.copy()
                 params['page'] = page
                 
-                logger.info(f"Fetching page {page}...")
+                logger.info("Fetching page %d...", page)
                 
-                response = self.session.get(base_list_url, params=params, timeout=30)
-                response.raise_for_status()
-                response.encoding = 'euc-jp'
-                
-                logger.debug(f"Page {page} URL: {response.url}")
-                logger.debug(f"Page {page} status: {response.status_code}")
+                # Retry-After等のレスポンスヘッダーを反映するため、BaseScraper.get_content経由で取得
+                content = self.get_content(base_list_url, params=params, timeout=30)
+                if content is None:
+                    logger.error("Failed to fetch race list page %d", page)
+                    break
                 
                 # レース一覧を抽出
-                page_races = self.list_extractor.extract_race_list(response.text)
+                page_races = self.list_extractor.extract_race_list(content)
                 
                 if not page_races:
-                    logger.info(f"No races found on page {page} - reached end of results")
+                    logger.info("No races found on page %d - reached end of results", page)
                     break
                 
-                logger.info(f"Page {page}: Found {len(page_races)} races")
+                logger.info("Page %d: Found %d races", page, len(page_races))
                 all_races.extend(page_races)
                 
                 # limitに達したら終了
@@ -193,16 +194,20 @@ class RaceScraper(BaseScraper):
                     all_races = all_races[:limit]  # 超過分を削除
                     break
                 
+                # 1ページ分に満たなければ次のページは存在しない
+                if len(page_races) < list_size:
+                    break
+                
                 page += 1
                 
                 # レート制限
                 time.sleep(self.delay)
             
-            logger.info(f"Total races collected: {len(all_races)}")
+            logger.info("Total races collected: %d", len(all_races))
             return all_races
             
         except Exception as e:
-            logger.error(f"Error fetching race list: {str(e)}")
+            logger.error("Error fetching race list: %s", e)
             return all_races  # エラー時もそれまでに取得したデータを返す
     
     def scrape_race_detail(self, race_id: str) -> Optional[Tuple[Race, List[RaceResult], List[RacePayout]]]:
@@ -217,22 +222,23 @@ class RaceScraper(BaseScraper):
         """
         
         detail_url = f"{self.base_url}/race/{race_id}/"
-        logger.info(f"race detail url: {detail_url}")
+        logger.info("race detail url: %s", detail_url)
         
         try:
-            logger.debug(f"Fetching race detail: {race_id}")
+            logger.debug("Fetching race detail: %s", race_id)
             
-            response = self.session.get(detail_url, timeout=30)
-            response.raise_for_status()
-            response.encoding = 'euc-jp'
+            content = self.get_content(detail_url, timeout=30)
+            if content is None:
+                logger.error("Failed to fetch race detail: %s", race_id)
+                return None
 
             # logger.info(f"extract_race_detailに送る前のrace_scraperでの処理です！rsponse=: {response.text[:1000]}")  # 最初の1000文字だけ表示
             
             # レース詳細を抽出（払い戻し情報も含む）
-            race_data = self.detail_extractor.extract_race_detail(response.text, race_id)
+            race_data = self.detail_extractor.extract_race_detail(content, race_id)
             
             if not race_data:
-                logger.warning(f"No race data extracted for {race_id}")
+                logger.warning("No race data extracted for %s", race_id)
                 return None
                 
             race, results, payouts = race_data
@@ -240,66 +246,90 @@ class RaceScraper(BaseScraper):
             # データバリデーション
             race_errors = self.validator.validate_race(race)
             if race_errors:
-                logger.warning(f"Race validation errors for {race_id}: {race_errors}")
+                logger.warning("Race validation errors for %s: %s", race_id, race_errors)
             
             for result in results:
                 result_errors = self.validator.validate_race_result(result)
                 if result_errors:
-                    logger.warning(f"Result validation errors for {result.horse_name}: {result_errors}")
+                    logger.warning("Result validation errors for %s: %s", result.horse_name, result_errors)
             
             # 払い戻しデータのバリデーション
             for payout in payouts:
                 payout_errors = self.validator.validate_race_payout(payout)
                 if payout_errors:
-                    logger.warning(f"Payout validation errors for {payout.bet_type} {payout.combination}: {payout_errors}")
+                    logger.warning("Payout validation errors for %s %s: %s", payout.bet_type, payout.combination, payout_errors)
             
             # 払い戻しデータの整合性チェック
             if payouts:
                 consistency_errors = self.validator.validate_payout_consistency(payouts)
                 if consistency_errors:
-                    logger.warning(f"Payout consistency errors for {race_id}: {consistency_errors}")
+                    logger.warning("Payout consistency errors for %s: %s", race_id, consistency_errors)
             
-            logger.info(f"Successfully extracted race data: {race_id} ({len(results)} horses, {len(payouts)} payouts)")
+            logger.info("Successfully extracted race data: %s (%d horses, %d payouts)", race_id, len(results), len(payouts))
             return race, results, payouts
             
         except Exception as e:
-            logger.error(f"Error fetching race detail {race_id}: {str(e)}")
+            logger.error("Error fetching race detail %s: %s", race_id, e)
             return None
     
     def scrape_and_store_races(self, 
                              race_list: List[Dict[str, Any]], 
-                             skip_existing: bool = True) -> Dict[str, int]:
+                             skip_existing: bool = True,
+                             batch_size: int = 25) -> Dict[str, int]:
         """
         レースリストを処理してデータベースに保存
         
         Args:
             race_list: scrape_race_list_by_conditions()で取得したレースリスト
             skip_existing: 既存レースをスキップするか
+            batch_size: 1トランザクションでまとめて保存するレース数
             
         Returns:
             Dict[str, int]: 処理結果統計
         """
         
+        # 一覧ページの境界で重複したレースを除外（race_idのないものは失敗として後で記録）
+        # race_idはここで一度だけ取り出し、ループ内では辞書を引き直さない
+        seen_race_ids: Set[str] = set()
+        race_entries: List[Tuple[Optional[str], Dict[str, Any]]] = []
+        for race_info in race_list:
+            race_id = race_info.get('race_id')
+            if race_id in seen_race_ids:
+                continue
+            if race_id:
+                seen_race_ids.add(race_id)
+            race_entries.append((race_id, race_info))
+        
+        total = len(race_entries)
         stats = {
-            'total': len(race_list),
+            'total': total,
             'success': 0,
             'skipped': 0,
             'failed': 0,
-            'errors': []
+            # サマリーでは先頭数件しか表示しないため、保持するエラーは直近100件に制限（返す際にlistにする）
+            'errors': deque(maxlen=100),
+            # 上限で捨てた分も含めたエラーの総数
+            'error_count': 0
         }
         
-        for i, race_info in enumerate(race_list, 1):
-            race_id = race_info.get('race_id')
-            
+        # 既存レースIDを1クエリでまとめて取得
+        existing_race_ids: Set[str] = set()
+        if skip_existing:
+            existing_race_ids = self.storage.get_existing_race_ids(list(seen_race_ids))
+        
+        # 保存待ちのレースデータ（batch_size件ごとにまとめて保存）
+        pending: List[Tuple[Race, List[RaceResult], List[RacePayout]]] = []
+        
+        for i, (race_id, race_info) in enumerate(race_entries, 1):
             if not race_id:
-                logger.warning(f"Missing race_id in race info: {race_info}")
+                logger.warning("Missing race_id in race info: %s", race_info)
                 stats['failed'] += 1
                 continue
             
             try:
                 # 既存チェック
-                if skip_existing and self.storage.check_race_exists(race_id):
-                    logger.info(f"Race already exists, skipping: {race_id}")
+                if skip_existing and race_id in existing_race_ids:
+                    logger.info("Race already exists, skipping: %s", race_id)
                     stats['skipped'] += 1
                     continue
                 
@@ -307,50 +337,72 @@ class RaceScraper(BaseScraper):
                 race_data = self.scrape_race_detail(race_id)
                 
                 if not race_data:
-                    logger.error(f"Failed to scrape race detail: {race_id}")
+                    logger.error("Failed to scrape race detail: %s", race_id)
                     stats['failed'] += 1
-                    stats['errors'].append(f"Detail scraping failed: {race_id}")
+                    self._record_errors(stats, [f"Detail scraping failed: {race_id}"])
                     continue
                 
-                race, results = race_data
+                pending.append(race_data)
                 
-                # データベースに保存
-                success = self.storage.insert_complete_race_data(race, results)
-                
-                if success:
-                    stats['success'] += 1
-                    logger.info(f"Race data saved successfully: {race_id} ({i}/{len(race_list)})")
-                else:
-                    stats['failed'] += 1
-                    stats['errors'].append(f"Database insert failed: {race_id}")
-                    logger.error(f"Failed to save race data: {race_id}")
+                # バッチサイズに達したらまとめてデータベースに保存
+                if len(pending) >= batch_size:
+                    self._flush_race_batch(pending, stats)
+                    logger.info("Progress: %d/%d", i, total)
+                    pending = []
                 
                 # レート制限
                 time.sleep(self.delay)
                 
             except Exception as e:
                 stats['failed'] += 1
-                error_msg = f"Unexpected error processing {race_id}: {str(e)}"
-                stats['errors'].append(error_msg)
-                logger.error(error_msg)
+                self._record_errors(stats, [f"Unexpected error processing {race_id}: {e}"])
+                logger.error("Unexpected error processing %s: %s", race_id, e)
                 
                 # 重大なエラーの場合は少し長めに待機
                 time.sleep(self.delay * 2)
         
+        # 残りのレースデータを保存
+        if pending:
+            self._flush_race_batch(pending, stats)
+        
         # 結果サマリー
         logger.info("=== Scraping Summary ===")
-        logger.info(f"Total races: {stats['total']}")
-        logger.info(f"Successfully processed: {stats['success']}")
-        logger.info(f"Skipped (existing): {stats['skipped']}")
-        logger.info(f"Failed: {stats['failed']}")
+        logger.info("Total races: %d", stats['total'])
+        logger.info("Successfully processed: %d", stats['success'])
+        logger.info("Skipped (existing): %d", stats['skipped'])
+        logger.info("Failed: %d", stats['failed'])
         
         if stats['errors']:
-            logger.warning(f"Errors encountered: {len(stats['errors'])}")
-            for error in stats['errors'][:5]:  # 最初の5件のみ表示
-                logger.warning(f"  - {error}")
+            logger.warning("Errors encountered: %d (latest %d kept)", stats['error_count'], len(stats['errors']))
+            for error in islice(stats['errors'], 5):  # 保持している直近のエラーのうち古い方から5件のみ表示
+                logger.warning("  - %s", error)
         
+        # 呼び出し元にはどの経路でもlistで返す
+        stats['errors'] = list(stats['errors'])
         return stats
     
+    @staticmethod
+    def _record_errors(stats: Dict[str, Any], errors: List[str]) -> None:
+        """エラーメッセージを記録（保持は直近100件まで、総数は error_count に数える）"""
+        stats['errors'].extend(errors)
+        stats['error_count'] += len(errors)
+    
+    def _flush_race_batch(self,
+                          batch: List[Tuple[Race, List[RaceResult], List[RacePayout]]],
+                          stats: Dict[str, Any]) -> None:
+        """保存待ちのレースデータをまとめてデータベースに保存（upsert_complete_races_supabase() 未作成のSupabaseでは1トランザクションにならない）"""
+        race_ids = [race.race_id for race, _, _ in batch]
+        
+        success = self.storage.insert_complete_race_data_batch(batch)
+        
+        if success:
+            stats['success'] += len(batch)
+            logger.info("Race data batch saved successfully: %d races", len(batch))
+        else:
+            stats['failed'] += len(batch)
+            self._record_errors(stats, [f"Database insert failed: {race_id}" for race_id in race_ids])
+            logger.error("Failed to save race data batch: %s", race_ids)
+    
     def scrape_g1_races_by_year(self, year: int) -> Dict[str, int]:
         """特定年のG1レースをすべて取得"""
         race_list = self.scrape_race_list_by_conditions(
@@ -361,10 +413,10 @@ class RaceScraper(BaseScraper):
         )
         
         if not race_list:
-            logger.warning(f"No G1 races found for year {year}")
-            return {'total': 0, 'success': 0, 'skipped': 0, 'failed': 0, 'errors': []}
+            logger.warning("No G1 races found for year %d", year)
+            return {'total': 0, 'success': 0, 'skipped': 0, 'failed': 0, 'errors': [], 'error_count': 0}
         
-        logger.info(f"Found {len(race_list)} G1 races for {year}")
+        logger.info("Found %d G1 races for %d", len(race_list), year)
         return self.scrape_and_store_races(race_list)
     
     def scrape_recent_races(self, days: int = 30) -> Dict[str, int]:
@@ -382,18 +434,12 @@ class RaceScraper(BaseScraper):
         )
         
         # 日付でフィルタリング（より精密に）
-        filtered_races = []
-        for race in race_list:
-            race_date_str = race.get('race_date')
-            if race_date_str:
-                try:
-                    race_date = datetime.strptime(race_date_str, '%Y-%m-%d').date()
-                    if start_date.date() <= race_date <= end_date.date():
-                        filtered_races.append(race)
-                except ValueError:
-                    logger.warning(f"Invalid race date format: {race_date_str}")
+        # YYYY-MM-DD形式の文字列は辞書順と日付順が一致するため文字列のまま比較
+        lo = start_date.strftime('%Y-%m-%d')
+        hi = end_date.strftime('%Y-%m-%d')
+        filtered_races = [r for r in race_list if (d := r.get('race_date')) and lo <= d <= hi]
         
-        logger.info(f"Found {len(filtered_races)} recent races (last {days} days)")
+        logger.info("Found %d recent races (last %d days)", len(filtered_races), days)
         return self.scrape_and_store_races(filtered_races)
 
 # 使用例とテスト用コード
@@ -1,29 +1,68 @@
-import time
+import asyncio
+import logging
+import math
 import re
 from datetime import date, datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import urllib.parse
 
+import lxml.html
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax未導入環境ではlxmlで解析
+    LexborHTMLParser = None
+
 from .base_scraper import BaseScraper
+from ..utils.async_http import afetch, can_run_async, create_async_session
+from ..utils.rate_limiter import RateLimiter
 from ...database.schemas.trainer_schema import Trainer
 
+# テーブル1行分の抽出結果（セルのテキスト一覧, 調教師名, 調教師リンクのhref）
+TrainerRow = Tuple[List[str], Optional[str], str]
+
+logger = logging.getLogger(__name__)
+
+# 調教師一覧テーブル
+TRAINER_TABLE_SELECTOR = 'table.nk_tb_common.race_table_01'
+
+# lxml用: 調教師一覧テーブルと、そのデータ行（最初の2行はヘッダー）
+_TRAINER_TABLE_XPATH = (
+    '//table[contains(concat(" ", normalize-space(@class), " "), " nk_tb_common ")'
+    ' and contains(concat(" ", normalize-space(@class), " "), " race_table_01 ")]'
+)
+_TRAINER_DATA_ROWS_XPATH = '(./tr | ./tbody/tr)[position() > 2]'
+
+# 行ごとに繰り返し使う正規表現はモジュール読み込み時にコンパイルしておく
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+_NON_DECIMAL_RE = re.compile(r'[^\d.]')
+_TRAINER_ID_RE = re.compile(r'/trainer/(\d+)/')
+
 
 class TrainerScraper(BaseScraper):
     """競馬調教師情報スクレイピングクラス"""
     
-    def __init__(self, delay: float = 1.0):
+    def __init__(self, delay: float = 1.0, concurrency: int = 8):
         """
         Args:
             delay: リクエスト間のディレイ（秒）
+            concurrency: 非同期取得時の同時リクエスト数
         """
         super().__init__()
         self.delay = delay
+        self.concurrency = concurrency
+        
+        # 同期・非同期とも、ページ間隔をdelay秒以上空ける（処理時間分は待たない）
+        self.rate_limiter = RateLimiter(1 / delay if delay > 0 else None)
     
     def scrape_trainers(self, limit: int = 100, range_type: str = "all") -> List[Trainer]:
         """
         調教師一覧をスクレイピング
         
+        aiohttpが使える場合は必要なページを並行取得し、なければ1ページずつ取得する。
+        イベントループが動いている環境（Jupyterなど）では同期取得する（非同期にはascrape_trainersを直接awaitする）。
+        
         Args:
             limit: 取得する調教師数（20, 50, 100の倍数推奨）
             range_type: 範囲指定（"all", "1", "2"など）
@@ -31,6 +70,9 @@ class TrainerScraper(BaseScraper):
         Returns:
             調教師オブジェクトのリスト
         """
+        if can_run_async():
+            return asyncio.run(self.ascrape_trainers(limit, range_type))
+        
         trainers = []
         page = 1
         remaining = limit
@@ -39,7 +81,7 @@ class TrainerScraper(BaseScraper):
             # 1ページ最大100件取得
             page_limit = min(remaining, 100)
             
-            print(f"ページ {page} を取得中... (残り {remaining} 件)")
+            logger.info("ページ %d を取得中... (残り %d 件)", page, remaining)
             
             page_trainers = self._scrape_page(page, range_type)
             
@@ -59,9 +101,44 @@ class TrainerScraper(BaseScraper):
                 break
             
             page += 1
-            time.sleep(self.delay)
         
-        print(f"合計 {len(trainers)} 名の調教師データを取得しました")
+        logger.info("合計 %d 名の調教師データを取得しました", len(trainers))
+        return trainers
+    
+    async def ascrape_trainers(self, limit: int = 100, range_type: str = "all") -> List[Trainer]:
+        """
+        調教師一覧を非同期にスクレイピング
+        
+        limitに必要なページ（1ページ最大100件）を同時実行数self.concurrencyで並行取得し、
+        ページ順に解析する。空のページに到達した時点で以降のページは破棄する。
+        リクエストの開始間隔は同期取得と同じくdelay秒以上空ける。
+        """
+        page_count = max(math.ceil(limit / 100), 1)
+        logger.info("%d ページを並行取得中... (同時実行数 %d)", page_count, self.concurrency)
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        headers = {'User-Agent': self.session.headers['User-Agent']}
+        async with create_async_session(headers, limit_per_host=self.concurrency) as session:
+            contents = await asyncio.gather(*(
+                afetch(session, semaphore, self._build_page_url(page, range_type), limiter=self.rate_limiter)
+                for page in range(1, page_count + 1)
+            ))
+        
+        trainers = []
+        for page, content in enumerate(contents, 1):
+            if content is None:
+                logger.error("ページ %d の取得に失敗しました", page)
+                break
+            
+            page_trainers = self._parse_trainer_table(content)
+            if not page_trainers:
+                break
+            
+            trainers.extend(page_trainers[:limit - len(trainers)])
+            if len(trainers) >= limit:
+                break
+        
+        logger.info("合計 %d 名の調教師データを取得しました", len(trainers))
         return trainers
     
     def scrape(self, target_id: str) -> Optional[Trainer]:
@@ -78,11 +155,20 @@ class TrainerScraper(BaseScraper):
         
         # 詳細ページから調教師データを解析
         # 現在は一覧ページメソッドを優先するため、簡易実装
-        print(f"調教師詳細ページの解析は未実装です: {target_id}")
+        logger.warning("調教師詳細ページの解析は未実装です: %s", target_id)
         return None
     
     def _scrape_page(self, page: int, range_type: str) -> List[Trainer]:
         """単一ページの調教師データをスクレイピング"""
+        content = self.get_content(self._build_page_url(page, range_type))
+        if content is None:
+            logger.error("ページ %d の取得に失敗しました", page)
+            return []
+        
+        return self._parse_trainer_table(content)
+    
+    def _build_page_url(self, page: int, range_type: str) -> str:
+        """調教師一覧ページのURLを構築"""
         params = {
             "type": "",
             "word": "",
@@ -94,108 +180,128 @@ class TrainerScraper(BaseScraper):
             "page": str(page)
         }
         
-        # URLを構築
         query_string = urllib.parse.urlencode(params)
-        url = f"{self.base_url}/trainer/list.html?{query_string}"
-        
-        soup = self.get_soup(url)
-        if not soup:
-            print(f"ページ {page} の取得に失敗しました")
-            return []
-        
-        return self._parse_trainer_table(soup)
+        return f"{self.base_url}/trainer/list.html?{query_string}"
     
-    def _parse_trainer_table(self, soup) -> List[Trainer]:
+    def _parse_trainer_table(self, html: bytes) -> List[Trainer]:
         """HTMLテーブルから調教師データを解析"""
         trainers = []
         
-        # テーブルを探す
-        table = soup.find('table', class_='nk_tb_common race_table_01')
-        if not table:
-            print("調教師テーブルが見つかりませんでした")
+        rows = self._extract_trainer_rows(html)
+        if rows is None:
+            logger.warning("調教師テーブルが見つかりませんでした")
             return trainers
         
-        # 全てのtr要素を取得（tbodyがない構造）
-        all_rows = table.find_all('tr')
-        if len(all_rows) < 3:
-            print("データ行が見つかりませんでした")
+        if not rows:
+            logger.warning("データ行が見つかりませんでした")
             return trainers
         
-        # データ行を取得（最初の2行はヘッダー）
-        rows = all_rows[2:]
+        # ページ内の全調教師で同じ取得時刻を使う
+        now = datetime.now()
         
         for i, row in enumerate(rows):
             try:
-                trainer = self._parse_trainer_row(row)
+                trainer = self._parse_trainer_row(*row, now=now)
                 if trainer:
                     trainers.append(trainer)
             except Exception as e:
-                print(f"行 {i+1} の調教師データ解析に失敗: {e}")
+                logger.warning("行 %d の調教師データ解析に失敗: %s", i + 1, e)
                 continue
         
-        print(f"このページで {len(trainers)} 名の調教師を取得しました")
+        logger.info("このページで %d 名の調教師を取得しました", len(trainers))
         return trainers
     
-    def _parse_trainer_row(self, row) -> Optional[Trainer]:
+    def _extract_trainer_rows(self, html: bytes) -> Optional[List[TrainerRow]]:
+        """
+        調教師テーブルのデータ行を抽出
+        
+        selectolax(Lexbor)が使える場合はそちらで、なければlxmlのXPathで解析する。
+        
+        Returns:
+            データ行のリスト（テーブルが見つからない場合はNone）
+        """
+        rows: List[TrainerRow] = []
+        
+        if LexborHTMLParser is not None:
+            tree = LexborHTMLParser(html.decode('euc-jp', errors='replace'))
+            table = tree.css_first(TRAINER_TABLE_SELECTOR)
+            if table is None:
+                return None
+            
+            # 最初の2行はヘッダー（tbodyがない構造）
+            for tr in table.css('tr')[2:]:
+                cells = tr.css('td')
+                link = cells[0].css_first('a') if cells else None
+                rows.append((
+                    [td.text(strip=True) for td in cells],
+                    link.text(strip=True) if link else None,
+                    (link.attributes.get('href') or '') if link else ''
+                ))
+            return rows
+        
+        doc = lxml.html.document_fromstring(html, parser=lxml.html.HTMLParser(encoding='euc-jp'))
+        tables = doc.xpath(_TRAINER_TABLE_XPATH)
+        if not tables:
+            return None
+        
+        # ヘッダー行の除外までXPath（C実装）側で行う（tbodyがない構造）
+        for tr in tables[0].xpath(_TRAINER_DATA_ROWS_XPATH):
+            cells = tr.xpath('./td')
+            link = cells[0].find('.//a') if cells else None
+            rows.append((
+                [self._element_text(td) for td in cells],
+                self._element_text(link) if link is not None else None,
+                link.get('href', '') if link is not None else ''
+            ))
+        return rows
+    
+    @staticmethod
+    def _element_text(element) -> str:
+        """lxml要素のテキストを取得（BeautifulSoupのget_text(strip=True)と同じく各テキストを前後空白除去して連結）"""
+        return ''.join(text.strip() for text in element.itertext())
+    
+    def _parse_trainer_row(self, texts: List[str], name_ja: Optional[str], href: str,
+                           now: Optional[datetime] = None) -> Optional[Trainer]:
         """テーブルの1行から調教師データを解析"""
-        cells = row.find_all('td')
-        if len(cells) < 22:  # 期待される列数より少ない場合はスキップ
+        if len(texts) < 22:  # 期待される列数より少ない場合はスキップ
             return None
         
         # 調教師名とIDを取得
-        name_cell = cells[0].find('a')
-        if not name_cell:
+        if name_ja is None:
             return None
         
-        name_ja = name_cell.get_text(strip=True)
-        href = name_cell.get('href', '')
         trainer_id = self._extract_trainer_id(href)
         
         if not trainer_id:
             return None
         
+        if now is None:
+            now = datetime.now()
+        
         # 所属地域を取得（美浦、栗東など）
-        region = cells[1].get_text(strip=True)
+        region = texts[1]
         
         # 生年月日
-        birthdate = self._parse_date(cells[2].get_text(strip=True))
+        birthdate = self._parse_date(texts[2])
         
-        # 成績データ
-        wins = self._parse_int(cells[3].get_text(strip=True))
-        seconds = self._parse_int(cells[4].get_text(strip=True))
-        thirds = self._parse_int(cells[5].get_text(strip=True))
-        fourths = self._parse_int(cells[6].get_text(strip=True))
+        # 件数列（texts[3]〜[16]）は1回の内包表記でまとめて整数化する
+        # 成績（1着〜着外）、条件別成績（重賞、特別、平場）、馬場別成績（芝、ダート）の順
+        (wins, seconds, thirds, fourths,
+         grade_entries, grade_wins, special_entries, special_wins, normal_entries, normal_wins,
+         turf_entries, turf_wins, dirt_entries, dirt_wins) = [
+            int(t) if t.isdecimal() else self._parse_int(t) for t in texts[3:17]
+        ]
         
         # 総出走回数を計算
         total_races = wins + seconds + thirds + fourths
         
-        # 条件別成績（重賞、特別、平場）
-        grade_entries = self._parse_int(cells[7].get_text(strip=True))
-        grade_wins = self._parse_int(cells[8].get_text(strip=True))
-        special_entries = self._parse_int(cells[9].get_text(strip=True))
-        special_wins = self._parse_int(cells[10].get_text(strip=True))
-        normal_entries = self._parse_int(cells[11].get_text(strip=True))
-        normal_wins = self._parse_int(cells[12].get_text(strip=True))
-        
-        # 馬場別成績（芝、ダート）
-        turf_entries = self._parse_int(cells[13].get_text(strip=True))
-        turf_wins = self._parse_int(cells[14].get_text(strip=True))
-        dirt_entries = self._parse_int(cells[15].get_text(strip=True))
-        dirt_wins = self._parse_int(cells[16].get_text(strip=True))
-        
-        # 勝率、連対率、複勝率
-        win_rate = self._parse_decimal(cells[17].get_text(strip=True).replace('%', ''))
-        second_rate = self._parse_decimal(cells[18].get_text(strip=True).replace('%', ''))
-        show_rate = self._parse_decimal(cells[19].get_text(strip=True).replace('%', ''))
-        
-        # 獲得賞金（万円）
-        prize_money_text = cells[20].get_text(strip=True).replace(',', '')
-        total_prize_money = self._parse_decimal(prize_money_text)
-        if total_prize_money:
-            total_prize_money = total_prize_money * 10000  # 万円を円に変換
+        # 勝率、連対率、複勝率（texts[17]〜[19]）は update_stats() で着順数から再計算するため解析しない
+        
+        # 獲得賞金（万円を円に変換し、Decimalへの変換はここで1回だけ行う）
+        total_prize_money = Decimal(self._parse_man_yen(texts[20]))
         
         # 代表馬
-        representative_horse = cells[21].get_text(strip=True) if len(cells) > 21 else None
+        representative_horse = texts[21]  # 22列以上あることは先頭で確認済み
         
         # JSONB用統計データを構築
         race_stats = {
@@ -230,15 +336,12 @@ class TrainerScraper(BaseScraper):
             wins=wins,
             seconds=seconds,
             thirds=thirds,
-            win_rate=win_rate,
-            second_rate=second_rate,
-            show_rate=show_rate,
             total_prize_money=total_prize_money,
             yearly_stats=yearly_stats,
             race_stats=race_stats,
             track_stats=track_stats,
-            created_at=datetime.now(),
-            updated_at=datetime.now()
+            created_at=now,
+            updated_at=now
         )
         
         # 統計を自動計算
@@ -248,7 +351,7 @@ class TrainerScraper(BaseScraper):
     
     def _extract_trainer_id(self, href: str) -> Optional[str]:
         """HREFから調教師IDを抽出"""
-        match = re.search(r'/trainer/(\d+)/', href)
+        match = _TRAINER_ID_RE.search(href)
         return match.group(1) if match else None
     
     def _parse_date(self, date_str: str) -> Optional[date]:
@@ -261,26 +364,33 @@ class TrainerScraper(BaseScraper):
     def _parse_int(self, text: str) -> Optional[int]:
         """文字列を整数に変換（空白・ハイフン・0対応）"""
         try:
-            if not text or text.strip() in ['', '-', '0']:
+            # 数字のみの値が大半なので、正規表現を通さずに変換する
+            if text.isdecimal():
+                return int(text)
+            if not text or text.strip() in ('', '-', '0'):
                 return 0
-            cleaned = re.sub(r'[^\d]', '', text)
+            cleaned = _NON_DIGIT_RE.sub('', text)
             return int(cleaned) if cleaned else 0
         except (ValueError, AttributeError):
             return 0
     
-    def _parse_decimal(self, text: str) -> Optional[Decimal]:
-        """文字列をDecimalに変換（空白・ハイフン・0%対応）"""
+    def _parse_man_yen(self, text: str) -> int:
+        """万円単位の金額文字列を円単位の整数に変換（空白・ハイフン対応）"""
         try:
-            if not text or text.strip() in ['', '-', '0%', '0']:
-                return Decimal('0.0')
-            cleaned = re.sub(r'[^\d.]', '', text)
-            return Decimal(cleaned) if cleaned else Decimal('0.0')
+            cleaned = _NON_DECIMAL_RE.sub('', text)
+            if not cleaned:
+                return 0
+            # 小数部（万円未満）も含めて整数演算のみで円に換算する
+            whole, _, fraction = cleaned.partition('.')
+            return int(whole or 0) * 10000 + int(fraction[:4].ljust(4, '0'))
         except (ValueError, AttributeError, TypeError):
-            return Decimal('0.0')
+            return 0
 
 
 # 使用例
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
     scraper = TrainerScraper(delay=1.0)
     
     # 全調教師データを取得（上限1000件で実質全件）
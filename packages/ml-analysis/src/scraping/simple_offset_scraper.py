@@ -1,24 +1,57 @@
 # シンプルなオフセット方式での馬リスト取得
 # 確実に重複なく大量データを収集
 
+import asyncio
 import requests
 from bs4 import BeautifulSoup
 import time
 import math
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Dict, Optional
 import json
+import logging
 import os
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson未導入環境では標準のjsonで保存
+    orjson = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax未導入環境ではBeautifulSoupで解析
+    LexborHTMLParser = None
+
+try:
+    from utils.async_http import afetch, can_run_async, create_async_session
+    from utils.http_session import create_session
+    from utils.rate_limiter import RateLimiter
+except ImportError:
+    from .utils.async_http import afetch, can_run_async, create_async_session
+    from .utils.http_session import create_session
+    from .utils.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# 馬リストの各行にある馬選択用チェックボックス
+HORSE_CHECKBOX_SELECTOR = 'input[type="checkbox"][name*="i-horse_"]'
+
 class SimpleOffsetHorseListScraper:
     """シンプルなオフセット方式でG1馬リストを取得"""
     
-    def __init__(self):
+    def __init__(self, concurrency: int = 8):
+        """
+        Args:
+            concurrency: 非同期取得時の同時リクエスト数
+        """
         self.base_url = "https://db.netkeiba.com/horse/list.html"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.concurrency = concurrency
+        # 一時的なエラー（429/5xx・接続リセット）はアダプタ層でバックオフ付きリトライ（BaseScraperと共通）
+        self.session = create_session()
+        
+        # 同期・非同期とも、ページ間隔を1秒以上空け、サーバー指定の待機時間（Retry-After等）も反映
+        self.rate_limiter = RateLimiter(1.0)
     
     def get_g1_horses_by_offset(
         self, 
@@ -38,12 +71,70 @@ class SimpleOffsetHorseListScraper:
         
         Returns:
             馬のリスト
+        
+        aiohttpが使えてイベントループが動いていない場合は非同期取得する
+        （Jupyterなどではaget_g1_horses_by_offsetを直接awaitする）。
         """
-        print(f"🎯 G1馬取得開始:")
-        print(f"   オフセット: {offset}")
-        print(f"   最大取得数: {max_horses}頭")
-        print(f"   最小生年: {min_birth_year}年")
-        print("-" * 50)
+        if can_run_async():
+            return asyncio.run(self.aget_g1_horses_by_offset(offset, max_horses, min_birth_year, per_page))
+        
+        return self._take_horses(
+            self._iter_pages(offset // per_page + 1, per_page),
+            offset, max_horses, min_birth_year, per_page
+        )
+    
+    async def aget_g1_horses_by_offset(
+        self,
+        offset: int = 0,
+        max_horses: int = 100,
+        min_birth_year: int = 2015,
+        per_page: int = 100
+    ) -> List[Dict]:
+        """
+        オフセット方式でG1馬を非同期に取得
+        
+        max_horsesに必要なページを同時実行数self.concurrencyずつ並行取得し、ページ順に処理する。
+        min_birth_yearより古い馬が出たページ以降は取得しない。引数はget_g1_horses_by_offsetと同じ。
+        """
+        start_page = (offset // per_page) + 1
+        end_page = start_page + math.ceil(((offset % per_page) + max_horses) / per_page)
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        headers = {'User-Agent': self.session.headers['User-Agent']}
+        pages = []
+        async with create_async_session(headers, limit_per_host=self.concurrency) as session:
+            for window_start in range(start_page, end_page, self.concurrency):
+                contents = await asyncio.gather(*(
+                    afetch(session, semaphore, self.base_url, params=self._page_params(page, per_page),
+                           limiter=self.rate_limiter)
+                    for page in range(window_start, min(window_start + self.concurrency, end_page))
+                ))
+                pages.extend(self._parse_horse_list(content) if content is not None else [] for content in contents)
+                
+                # 取得失敗・生年の下限到達があれば以降のページは不要（生年降順）
+                if any(not page_horses or page_horses[-1]['birth_year'] < min_birth_year
+                       for page_horses in pages[-len(contents):]):
+                    break
+        
+        return self._take_horses(pages, offset, max_horses, min_birth_year, per_page)
+    
+    def _iter_pages(self, start_page: int, per_page: int) -> Iterator[List[Dict]]:
+        """開始ページから1ページずつ馬リストを取得（同期取得用）"""
+        page = start_page
+        while True:
+            yield self._get_page_horses(page, per_page)
+            page += 1
+    
+    def _take_horses(
+        self,
+        pages: Iterable[List[Dict]],
+        offset: int,
+        max_horses: int,
+        min_birth_year: int,
+        per_page: int
+    ) -> List[Dict]:
+        """ページ順の馬リストからオフセット位置以降の馬を取り出す"""
+        logger.info("G1馬取得開始: オフセット=%d, 最大取得数=%d頭, 最小生年=%d年", offset, max_horses, min_birth_year)
         
         # ページ計算
         start_page = (offset // per_page) + 1
@@ -54,82 +145,98 @@ class SimpleOffsetHorseListScraper:
         horses_collected = 0
         position_in_page = start_position
         
-        print(f"📄 開始ページ: {current_page}, ページ内位置: {start_position}")
+        logger.debug("開始ページ: %d, ページ内位置: %d", current_page, start_position)
         
-        while horses_collected < max_horses:
-            print(f"\n📄 ページ{current_page}を処理中...")
-            
-            # ページのデータを取得
-            page_horses = self._get_page_horses(current_page, per_page)
-            
+        # 1頭ごとのログはDEBUG有効時のみ出力する
+        verbose = logger.isEnabledFor(logging.DEBUG)
+        
+        for page_horses in pages:
             if not page_horses:
-                print("❌ データ取得に失敗しました")
+                logger.error("ページ%dのデータ取得に失敗しました", current_page)
                 break
             
+            page_start_count = horses_collected
+            
             # ページ内の指定位置から処理開始
             for i in range(position_in_page, len(page_horses)):
                 horse = page_horses[i]
                 
                 # 生年チェック
                 if horse['birth_year'] < min_birth_year:
-                    print(f"⏹️ 生年{horse['birth_year']}年の{horse['name_ja']}に到達。処理終了")
+                    logger.info("生年%d年の%sに到達。処理終了（合計%d頭）", horse['birth_year'], horse['name_ja'], len(horses))
                     return horses
                 
                 horses.append(horse)
                 horses_collected += 1
                 
-                print(f"  ✓ [{horses_collected:3d}] {horse['name_ja']} ({horse['birth_year']}年)")
+                if verbose:
+                    logger.debug("[%3d] %s (%d年)", horses_collected, horse['name_ja'], horse['birth_year'])
                 
                 # 目標頭数に到達
                 if horses_collected >= max_horses:
                     break
             
+            logger.info("ページ%d: %d頭取得（累計%d頭）", current_page, horses_collected - page_start_count, horses_collected)
+            
+            # 目標頭数に到達したら次のページは取得しない
+            if horses_collected >= max_horses:
+                break
+            
             # 次のページへ
             current_page += 1
             position_in_page = 0  # 次のページからは最初から
-            
-            # API負荷軽減
-            time.sleep(1)
         
-        print(f"\n✅ 合計{len(horses)}頭を取得しました")
+        logger.info("合計%d頭を取得しました", len(horses))
         return horses
     
-    def _get_page_horses(self, page: int, limit: int = 100) -> List[Dict]:
-        """指定ページの馬リストを取得"""
-        params = {
+    def _page_params(self, page: int, limit: int = 100) -> Dict:
+        """馬リストページのクエリパラメータ"""
+        return {
             "grade[]": "4",  # G1勝利馬
             "sort": "age-desc",  # 生年降順
             "limit": limit,
             "page": page
         }
-        
+    
+    def _get_page_horses(self, page: int, limit: int = 100) -> List[Dict]:
+        """指定ページの馬リストを取得"""
         try:
-            response = self.session.get(self.base_url, params=params)
+            # API負荷軽減（固定sleepではなく前回リクエストからの経過時間とヘッダーで待機）
+            self.rate_limiter.wait()
+            response = self.session.get(self.base_url, params=self._page_params(page, limit), timeout=15)
+            self.rate_limiter.update(response.headers)
             response.raise_for_status()
-            response.encoding = 'euc-jp'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            return self._parse_horse_list(soup)
+            return self._parse_horse_list(response.content)
             
         except requests.RequestException as e:
-            print(f"❌ ページ{page}取得エラー: {e}")
+            logger.error("ページ%d取得エラー: %s", page, e)
             return []
     
-    def _parse_horse_list(self, soup: BeautifulSoup) -> List[Dict]:
-        """ページのHTMLから馬情報を抽出"""
+    def _parse_horse_list(self, html: bytes) -> List[Dict]:
+        """
+        ページのHTMLから馬情報を抽出
+        
+        selectolax(Lexbor)が使える場合はそちらで、なければBeautifulSoupで解析する。
+        """
+        if LexborHTMLParser is not None:
+            return self._parse_horse_list_lexbor(html)
+        
+        # デコードはlxml(libxml2)側に任せるため、bytesのまま渡す
+        soup = BeautifulSoup(html, 'lxml', from_encoding='euc-jp')
         horses = []
         
-        for row in soup.find_all('tr'):
+        # 馬のチェックボックスを直接選択し、その行だけを処理する（レイアウト用の行は走査しない）
+        for checkbox in soup.select(HORSE_CHECKBOX_SELECTOR):
             try:
-                # チェックボックスから馬IDを取得
-                checkbox = row.find('input', {'type': 'checkbox'})
-                if not checkbox or 'i-horse_' not in checkbox.get('name', ''):
+                row = checkbox.find_parent('tr')
+                if row is None:
                     continue
                 
+                # チェックボックスから馬IDを取得
                 horse_id = checkbox.get('value')
                 
-                # 各tdを取得
-                tds = row.find_all('td')
+                # 各tdを取得（find_allの再帰探索を避け、直下の子要素だけを見る）
+                tds = [c for c in row.children if c.name == 'td']
                 if len(tds) < 4:
                     continue
                 
@@ -155,7 +262,56 @@ class SimpleOffsetHorseListScraper:
                     'birth_year': birth_year
                 })
                 
-            except (ValueError, AttributeError):
+            except (ValueError, AttributeError, TypeError):
+                continue
+        
+        return horses
+    
+    def _parse_horse_list_lexbor(self, html: bytes) -> List[Dict]:
+        """selectolax(Lexbor)でページのHTMLから馬情報を抽出"""
+        tree = LexborHTMLParser(html.decode('euc-jp', errors='replace'))
+        horses = []
+        
+        # 馬のチェックボックスを直接選択し、その行だけを処理する（レイアウト用の行は走査しない）
+        for checkbox in tree.css(HORSE_CHECKBOX_SELECTOR):
+            try:
+                row = checkbox.parent
+                while row is not None and row.tag != 'tr':
+                    row = row.parent
+                if row is None:
+                    continue
+                
+                # チェックボックスから馬IDを取得
+                horse_id = checkbox.attributes.get('value')
+                
+                # 各tdを取得
+                tds = row.css('td')
+                if len(tds) < 4:
+                    continue
+                
+                # 馬名を取得（2番目のtd）
+                name_cell = tds[1].css_first('a')
+                if name_cell is None:
+                    continue
+                name_ja = name_cell.text(strip=True)
+                
+                # 性別を取得（3番目のtd）
+                sex = tds[2].text(strip=True)
+                
+                # 生年を取得（4番目のtd）
+                birth_year_link = tds[3].css_first('a')
+                if birth_year_link is None:
+                    continue
+                birth_year = int(birth_year_link.text(strip=True))
+                
+                horses.append({
+                    'id': int(horse_id),
+                    'name_ja': name_ja,
+                    'sex': sex,
+                    'birth_year': birth_year
+                })
+                
+            except (ValueError, AttributeError, TypeError):
                 continue
         
         return horses
@@ -187,7 +343,8 @@ class CompleteBatchProcessor:
         start_offset: int = 0,
         min_birth_year: int = 2015,
         process_details: bool = True,
-        delay_between_horses: int = 3
+        delay_between_horses: int = 3,
+        max_workers: int = 8
     ) -> Dict:
         """
         馬リスト取得 + 詳細処理の完全バッチ
@@ -198,7 +355,8 @@ class CompleteBatchProcessor:
             start_offset: 開始オフセット
             min_birth_year: 最小生年
             process_details: 詳細データ処理するか
-            delay_between_horses: 馬間の処理間隔
+            delay_between_horses: netkeibaへのリクエスト間隔（秒、全スレッド合計で）
+            max_workers: 詳細処理の並行数
         
         Returns:
             処理結果
@@ -210,7 +368,7 @@ class CompleteBatchProcessor:
         print(f"📦 バッチサイズ: {batch_size}頭")
         print(f"📍 開始オフセット: {start_offset}")
         print(f"📅 最小生年: {min_birth_year}年")
-        print(f"🔧 詳細処理: {'有効' if process_details else '無効'}")
+        print(f"🔧 詳細処理: {'有効' if process_details else '無効'}（並行数: {max_workers}）")
         print()
         
         # Step 1: 馬リスト取得
@@ -237,7 +395,8 @@ class CompleteBatchProcessor:
                 print("❌ 詳細処理をスキップします")
                 process_details = False
             else:
-                detail_results = self._process_horse_details(horse_list, delay_between_horses)
+                rate_per_sec = 1 / delay_between_horses if delay_between_horses > 0 else None
+                detail_results = self._process_horse_details(horse_list, rate_per_sec, max_workers)
                 results.update(detail_results)
         
         # 結果サマリー
@@ -251,13 +410,14 @@ class CompleteBatchProcessor:
     def _collect_horse_list(self, total_target: int, batch_size: int, start_offset: int, min_birth_year: int) -> List[Dict]:
         """馬リストの収集"""
         all_horses = []
+        seen_ids = set()  # 取得済みの馬ID（バッチをまたいで使い回す）
         current_offset = start_offset
         
         while len(all_horses) < total_target:
             remaining = total_target - len(all_horses)
             current_batch_size = min(batch_size, remaining)
             
-            print(f"📦 リストバッチ: オフセット{current_offset}, {current_batch_size}頭取得")
+            logger.info("リストバッチ: オフセット%d, %d頭取得", current_offset, current_batch_size)
             
             batch_horses = self.list_scraper.get_g1_horses_by_offset(
                 offset=current_offset,
@@ -266,29 +426,34 @@ class CompleteBatchProcessor:
             )
             
             if not batch_horses:
-                print("⚠️ これ以上馬が見つかりません")
+                logger.warning("これ以上馬が見つかりません")
                 break
             
             # 重複チェック
             new_horses = []
-            existing_ids = {horse['id'] for horse in all_horses}
             
             for horse in batch_horses:
-                if horse['id'] not in existing_ids:
+                if horse['id'] not in seen_ids:
+                    seen_ids.add(horse['id'])
                     new_horses.append(horse)
             
             all_horses.extend(new_horses)
             current_offset += len(batch_horses)
             
-            print(f"✅ リストバッチ完了: {len(new_horses)}頭追加, 累計{len(all_horses)}頭")
+            logger.info("リストバッチ完了: %d頭追加, 累計%d頭", len(new_horses), len(all_horses))
             
             if len(all_horses) < total_target:
                 time.sleep(2)
         
         return all_horses
     
-    def _process_horse_details(self, horse_list: List[Dict], delay: int) -> Dict:
-        """馬の詳細データ処理"""
+    def _process_horse_details(self, horse_list: List[Dict], rate_per_sec: Optional[float], max_workers: int = 8) -> Dict:
+        """
+        馬の詳細データ処理
+        
+        max_workersスレッドで並行処理し、netkeibaへのリクエストは全スレッド合計でrate_per_sec件/秒までに抑える。
+        HorseScraperは1つを共有し、そのRateLimiterで1馬あたり複数回のページ取得をすべて間隔制御する。
+        """
         results = {
             'success': [],
             'failed': [],
@@ -296,44 +461,46 @@ class CompleteBatchProcessor:
         }
         
         total = len(horse_list)
+        self.detail_scraper.rate_limiter = RateLimiter(rate_per_sec)
         
-        for i, horse in enumerate(horse_list, 1):
-            horse_id = str(horse['id'])
-            horse_name = horse['name_ja']
-            
-            print(f"🐎 [{i}/{total}] {horse_name} (ID: {horse_id})")
+        def process(horse: Dict) -> bool:
+            return self.detail_scraper.scrape(str(horse['id']))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(process, horse): horse for horse in horse_list}
             
-            try:
-                success = self.detail_scraper.scrape(horse_id)
+            for i, future in enumerate(as_completed(futures), 1):
+                horse = futures[future]
+                horse_id = str(horse['id'])
+                horse_name = horse['name_ja']
                 
-                if success:
-                    results['success'].append({
-                        'id': horse_id,
-                        'name': horse_name,
-                        'processed_at': datetime.now().isoformat()
-                    })
-                    print(f"    ✅ 完了")
-                else:
+                try:
+                    success = future.result()
+                    
+                    if success:
+                        results['success'].append({
+                            'id': horse_id,
+                            'name': horse_name,
+                            'processed_at': datetime.now().isoformat()
+                        })
+                        logger.info("[%d/%d] %s (ID: %s) 完了", i, total, horse_name, horse_id)
+                    else:
+                        results['failed'].append({
+                            'id': horse_id,
+                            'name': horse_name,
+                            'error': '詳細スクレイピング失敗'
+                        })
+                        logger.warning("[%d/%d] %s (ID: %s) 失敗", i, total, horse_name, horse_id)
+                    
+                except Exception as e:
                     results['failed'].append({
                         'id': horse_id,
                         'name': horse_name,
-                        'error': '詳細スクレイピング失敗'
+                        'error': str(e)
                     })
-                    print(f"    ❌ 失敗")
+                    logger.error("[%d/%d] %s (ID: %s) エラー: %s", i, total, horse_name, horse_id, e)
                 
-            except Exception as e:
-                results['failed'].append({
-                    'id': horse_id,
-                    'name': horse_name,
-                    'error': str(e)
-                })
-                print(f"    ❌ エラー: {e}")
-            
-            results['total_processed'] += 1
-            
-            # 待機（最後以外）
-            if i < total:
-                time.sleep(delay)
+                results['total_processed'] += 1
         
         return results
     
@@ -362,8 +529,13 @@ class CompleteBatchProcessor:
         filepath = os.path.join('outputs', filename)
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                data = orjson.dumps(results, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(results, ensure_ascii=False, indent=2).encode('utf-8')
+            
+            with open(filepath, 'wb') as f:
+                f.write(data)
             print(f"📄 結果保存: {filepath}")
         except Exception as e:
             print(f"❌ ファイル保存エラー: {e}")
@@ -436,5 +608,7 @@ def test_offset_scraper():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
     # テスト実行
     test_horses = test_offset_scraper()
\ No newline at end of file
@@ -3,16 +3,28 @@ PostgreSQLデータベース操作クラス
 src/scraping/storage/postgresql_storage.py
 """
 
+import atexit
 import os
 import logging
-from typing import Optional, List, Dict, Any, Tuple
+import threading
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, List, Dict, Any, Tuple, Set, Iterable
+from collections import OrderedDict
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import date, datetime
 import json
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extensions import connection as PGConnection
+from psycopg2.extras import Json, RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from psycopg2 import sql
+from psycopg2.errors import UndefinedFunction
+
+try:
+    import orjson
+except ImportError:  # orjson未導入環境では標準のjsonでシリアライズ
+    orjson = None
 
 from ...database.schemas.race_schema import Race, RaceResult, RacePayout
 from ...database.schemas.jockey_schema import Jockey
@@ -22,24 +34,510 @@ from ...database.schemas.breeder_schema import Breeder
 
 logger = logging.getLogger(__name__)
 
+# race_resultsへのCOPY・マージで使う列（この順でCOPYする）
+_RACE_RESULT_COLUMNS = (
+    'race_id', 'horse_id', 'horse_name', 'bracket_number', 'horse_number',
+    'age', 'sex', 'jockey_weight', 'jockey_name', 'trainer_name',
+    'finish_position', 'jockey_id', 'trainer_region', 'trainer_id',
+    'race_time', 'time_diff', 'passing_order', 'last_3f', 'odds',
+    'popularity', 'horse_weight', 'weight_change', 'prize_money',
+    'owner_id', 'owner_name', 'created_at', 'updated_at'
+)
+
+
+# race_payoutsへの登録で使う列
+_RACE_PAYOUT_COLUMNS = (
+    'race_id', 'bet_type', 'combination', 'payout_amount', 'popularity',
+    'created_at', 'updated_at'
+)
+
+# created_at / updated_at 以外の列をRacePayoutからまとめて取り出す（先頭3列がキー）
+_get_race_payout_fields = attrgetter(*_RACE_PAYOUT_COLUMNS[:-2])
+
+# race_payoutsへの一括登録（execute_values用）
+_RACE_PAYOUT_UPSERT_SQL = f"""
+    INSERT INTO race_payouts ({', '.join(_RACE_PAYOUT_COLUMNS)})
+    VALUES %s
+    ON CONFLICT (race_id, bet_type, combination) DO UPDATE SET
+        payout_amount = EXCLUDED.payout_amount,
+        popularity = EXCLUDED.popularity,
+        updated_at = EXCLUDED.updated_at
+"""
+
+# 払い戻しをexecute_valuesではなくCOPYで投入する件数のしきい値
+_PAYOUT_COPY_THRESHOLD = 500
+
+# jockeysへの登録で使う列（_jockey_rowはこの順の値タプルを返す）
+_JOCKEY_COLUMNS = (
+    'jockey_id', 'name_ja', 'name_en', 'birthdate', 'region', 'license_type',
+    'trainer_name', 'debut_date', 'status', 'weight', 'height', 'total_races',
+    'wins', 'seconds', 'thirds', 'win_rate', 'show_rate', 'total_prize_money',
+    'yearly_stats', 'track_stats', 'distance_stats', 'created_at',
+    'updated_at'
+)
+
+# trainersへの登録で使う列（_trainer_rowはこの順の値タプルを返す）
+_TRAINER_COLUMNS = (
+    'trainer_id', 'name_ja', 'name_en', 'birthdate', 'region', 'license_type',
+    'debut_date', 'status', 'total_races', 'wins', 'seconds', 'thirds',
+    'win_rate', 'second_rate', 'show_rate', 'total_prize_money',
+    'yearly_stats', 'race_stats', 'track_stats', 'distance_stats',
+    'created_at', 'updated_at'
+)
+
+# ownersへの登録で使う列（_owner_rowはこの順の値タプルを返す）
+_OWNER_COLUMNS = (
+    'owner_id', 'name_ja', 'name_en', 'birthdate', 'owner_type',
+    'license_date', 'status', 'total_races', 'wins', 'seconds', 'thirds',
+    'win_rate', 'second_rate', 'show_rate', 'total_prize_money',
+    'total_horses', 'active_horses', 'retired_horses', 'stakes_wins',
+    'grade1_wins', 'yearly_stats', 'race_stats', 'track_stats',
+    'distance_stats', 'horse_list', 'created_at', 'updated_at'
+)
+
+# breedersへの登録で使う列（_breeder_rowはこの順の値タプルを返す）
+_BREEDER_COLUMNS = (
+    'breeder_id', 'name_ja', 'name_en', 'established_date', 'location',
+    'breeder_type', 'status', 'total_races', 'wins', 'seconds', 'thirds',
+    'win_rate', 'second_rate', 'show_rate', 'total_prize_money',
+    'total_horses_produced', 'active_horses', 'retired_horses', 'stakes_wins',
+    'grade1_wins', 'debut_horses', 'yearly_stats', 'race_stats', 'track_stats',
+    'distance_stats', 'produced_horses', 'stallion_stats', 'created_at',
+    'updated_at'
+)
+
+
+def _changed_condition(table: str, columns: Iterable[str]) -> str:
+    """ON CONFLICT DO UPDATE の WHERE 句（columnsのいずれかが変わる場合のみ行を書き換える）"""
+    columns = tuple(columns)
+    current = ', '.join(f"{table}.{column}" for column in columns)
+    excluded = ', '.join(f"EXCLUDED.{column}" for column in columns)
+    return f"({current}) IS DISTINCT FROM ({excluded})"
+
+
+# 再取得で内容が変わらない行は更新しない（キー・created_at・updated_at以外を比較）
+_JOCKEY_CHANGED = _changed_condition('jockeys', _JOCKEY_COLUMNS[1:-2])
+_TRAINER_CHANGED = _changed_condition('trainers', _TRAINER_COLUMNS[1:-2])
+_OWNER_CHANGED = _changed_condition('owners', _OWNER_COLUMNS[1:-2])
+_BREEDER_CHANGED = _changed_condition('breeders', _BREEDER_COLUMNS[1:-2])
+
+# jockeysへの一括登録（execute_values用、同じIDは呼び出し側で1行にまとめる）
+_JOCKEY_UPSERT_SQL = f"""
+    INSERT INTO jockeys (
+        jockey_id, name_ja, name_en, birthdate, region, license_type, trainer_name,
+        debut_date, status, weight, height, total_races, wins,
+        seconds, thirds, win_rate, show_rate, total_prize_money,
+        yearly_stats, track_stats, distance_stats, created_at, updated_at
+    ) VALUES %s
+    ON CONFLICT (jockey_id) DO UPDATE SET
+        name_ja = EXCLUDED.name_ja,
+        name_en = EXCLUDED.name_en,
+        birthdate = EXCLUDED.birthdate,
+        region = EXCLUDED.region,
+        license_type = EXCLUDED.license_type,
+        trainer_name = EXCLUDED.trainer_name,
+        debut_date = EXCLUDED.debut_date,
+        status = EXCLUDED.status,
+        weight = EXCLUDED.weight,
+        height = EXCLUDED.height,
+        total_races = EXCLUDED.total_races,
+        wins = EXCLUDED.wins,
+        seconds = EXCLUDED.seconds,
+        thirds = EXCLUDED.thirds,
+        win_rate = EXCLUDED.win_rate,
+        show_rate = EXCLUDED.show_rate,
+        total_prize_money = EXCLUDED.total_prize_money,
+        yearly_stats = EXCLUDED.yearly_stats,
+        track_stats = EXCLUDED.track_stats,
+        distance_stats = EXCLUDED.distance_stats,
+        updated_at = EXCLUDED.updated_at
+    WHERE {_JOCKEY_CHANGED}
+"""
+_JOCKEY_VALUES_TEMPLATE = """(
+    %s, %s, %s, %s, %s, %s, %s,
+    %s, %s, %s, %s, %s, %s,
+    %s, %s, %s, %s, %s,
+    %s::jsonb, %s::jsonb, %s::jsonb,
+    %s, %s
+)"""
+
+# trainersへの一括登録（execute_values用、同じIDは呼び出し側で1行にまとめる）
+_TRAINER_UPSERT_SQL = f"""
+    INSERT INTO trainers (
+        trainer_id, name_ja, name_en, birthdate, region, license_type,
+        debut_date, status, total_races, wins, seconds, thirds,
+        win_rate, second_rate, show_rate, total_prize_money,
+        yearly_stats, race_stats, track_stats, distance_stats,
+        created_at, updated_at
+    ) VALUES %s
+    ON CONFLICT (trainer_id) DO UPDATE SET
+        name_ja = EXCLUDED.name_ja,
+        name_en = EXCLUDED.name_en,
+        birthdate = EXCLUDED.birthdate,
+        region = EXCLUDED.region,
+        license_type = EXCLUDED.license_type,
+        debut_date = EXCLUDED.debut_date,
+        status = EXCLUDED.status,
+        total_races = EXCLUDED.total_races,
+        wins = EXCLUDED.wins,
+        seconds = EXCLUDED.seconds,
+        thirds = EXCLUDED.thirds,
+        win_rate = EXCLUDED.win_rate,
+        second_rate = EXCLUDED.second_rate,
+        show_rate = EXCLUDED.show_rate,
+        total_prize_money = EXCLUDED.total_prize_money,
+        yearly_stats = EXCLUDED.yearly_stats,
+        race_stats = EXCLUDED.race_stats,
+        track_stats = EXCLUDED.track_stats,
+        distance_stats = EXCLUDED.distance_stats,
+        updated_at = EXCLUDED.updated_at
+    WHERE {_TRAINER_CHANGED}
+"""
+_TRAINER_VALUES_TEMPLATE = """(
+    %s, %s, %s, %s, %s, %s,
+    %s, %s, %s, %s, %s, %s,
+    %s, %s, %s, %s,
+    %s::jsonb, %s::jsonb, %s::jsonb, %s::jsonb,
+    %s, %s
+)"""
+
+# ownersへの一括登録（execute_values用、同じIDは呼び出し側で1行にまとめる）
+_OWNER_UPSERT_SQL = f"""
+    INSERT INTO owners (
+        owner_id, name_ja, name_en, birthdate, owner_type, license_date,
+        status, total_races, wins, seconds, thirds,
+        win_rate, second_rate, show_rate, total_prize_money,
+        total_horses, active_horses, retired_horses, stakes_wins, grade1_wins,
+        yearly_stats, race_stats, track_stats, distance_stats, horse_list,
+        created_at, updated_at
+    ) VALUES %s
+    ON CONFLICT (owner_id) DO UPDATE SET
+        name_ja = EXCLUDED.name_ja,
+        name_en = EXCLUDED.name_en,
+        birthdate = EXCLUDED.birthdate,
+        owner_type = EXCLUDED.owner_type,
+        license_date = EXCLUDED.license_date,
+        status = EXCLUDED.status,
+        total_races = EXCLUDED.total_races,
+        wins = EXCLUDED.wins,
+        seconds = EXCLUDED.seconds,
+        thirds = EXCLUDED.thirds,
+        win_rate = EXCLUDED.win_rate,
+        second_rate = EXCLUDED.second_rate,
+        show_rate = EXCLUDED.show_rate,
+        total_prize_money = EXCLUDED.total_prize_money,
+        total_horses = EXCLUDED.total_horses,
+        active_horses = EXCLUDED.active_horses,
+        retired_horses = EXCLUDED.retired_horses,
+        stakes_wins = EXCLUDED.stakes_wins,
+        grade1_wins = EXCLUDED.grade1_wins,
+        yearly_stats = EXCLUDED.yearly_stats,
+        race_stats = EXCLUDED.race_stats,
+        track_stats = EXCLUDED.track_stats,
+        distance_stats = EXCLUDED.distance_stats,
+        horse_list = EXCLUDED.horse_list,
+        updated_at = EXCLUDED.updated_at
+    WHERE {_OWNER_CHANGED}
+"""
+_OWNER_VALUES_TEMPLATE = """(
+    %s, %s, %s, %s, %s, %s,
+    %s, %s, %s, %s, %s,
+    %s, %s, %s, %s,
+    %s, %s, %s, %s, %s,
+    %s::jsonb, %s::jsonb, %s::jsonb, %s::jsonb, %s::jsonb,
+    %s, %s
+)"""
+
+# breedersへの一括登録（execute_values用、同じIDは呼び出し側で1行にまとめる）
+_BREEDER_UPSERT_SQL = f"""
+    INSERT INTO breeders (
+        breeder_id, name_ja, name_en, established_date, location, breeder_type,
+        status, total_races, wins, seconds, thirds,
+        win_rate, second_rate, show_rate, total_prize_money,
+        total_horses_produced, active_horses, retired_horses, stakes_wins, grade1_wins, debut_horses,
+        yearly_stats, race_stats, track_stats, distance_stats, produced_horses, stallion_stats,
+        created_at, updated_at
+    ) VALUES %s
+    ON CONFLICT (breeder_id) DO UPDATE SET
+        name_ja = EXCLUDED.name_ja,
+        name_en = EXCLUDED.name_en,
+        established_date = EXCLUDED.established_date,
+        location = EXCLUDED.location,
+        breeder_type = EXCLUDED.breeder_type,
+        status = EXCLUDED.status,
+        total_races = EXCLUDED.total_races,
+        wins = EXCLUDED.wins,
+        seconds = EXCLUDED.seconds,
+        thirds = EXCLUDED.thirds,
+        win_rate = EXCLUDED.win_rate,
+        second_rate = EXCLUDED.second_rate,
+        show_rate = EXCLUDED.show_rate,
+        total_prize_money = EXCLUDED.total_prize_money,
+        total_horses_produced = EXCLUDED.total_horses_produced,
+        active_horses = EXCLUDED.active_horses,
+        retired_horses = EXCLUDED.retired_horses,
+        stakes_wins = EXCLUDED.stakes_wins,
+        grade1_wins = EXCLUDED.grade1_wins,
+        debut_horses = EXCLUDED.debut_horses,
+        yearly_stats = EXCLUDED.yearly_stats,
+        race_stats = EXCLUDED.race_stats,
+        track_stats = EXCLUDED.track_stats,
+        distance_stats = EXCLUDED.distance_stats,
+        produced_horses = EXCLUDED.produced_horses,
+        stallion_stats = EXCLUDED.stallion_stats,
+        updated_at = EXCLUDED.updated_at
+    WHERE {_BREEDER_CHANGED}
+"""
+_BREEDER_VALUES_TEMPLATE = """(
+    %s, %s, %s, %s, %s, %s,
+    %s, %s, %s, %s, %s,
+    %s, %s, %s, %s,
+    %s, %s, %s, %s, %s, %s,
+    %s::jsonb, %s::jsonb, %s::jsonb, %s::jsonb, %s::jsonb, %s::jsonb,
+    %s, %s
+)"""
+
+# 馬主・生産者をexecute_valuesではなくCOPYで投入する件数のしきい値（過去データの一括投入向け）
+_ENTITY_COPY_THRESHOLD = 1000
+
+# レース結果をexecute_valuesではなくCOPYで投入する件数のしきい値（1レース分は常にexecute_values）
+_RACE_RESULT_COPY_THRESHOLD = 200
+
+# race_resultsの競合時に更新する列
+_RACE_RESULT_UPDATE_COLUMNS = (
+    'updated_at', 'finish_position', 'race_time', 'odds',
+    'popularity', 'horse_weight', 'weight_change'
+)
+
+# PostgRESTのupsertと同じく、既存行もキーとcreated_at以外の全列を上書きする場合の更新列
+_RACE_RESULT_OVERWRITE_COLUMNS = tuple(
+    column for column in _RACE_RESULT_COLUMNS if column not in ('race_id', 'horse_id', 'created_at')
+)
+
+# race_resultsへの一括登録（execute_values用）
+_RACE_RESULT_UPSERT_SQL = f"""
+    INSERT INTO race_results ({', '.join(_RACE_RESULT_COLUMNS)})
+    VALUES %s
+    ON CONFLICT (race_id, horse_id) DO UPDATE SET
+        {', '.join(f"{column} = EXCLUDED.{column}" for column in _RACE_RESULT_UPDATE_COLUMNS)}
+"""
+
+# created_at / updated_at 以外の列をRaceResultから1回の呼び出しでまとめて取り出す
+_get_race_result_fields = attrgetter(*_RACE_RESULT_COLUMNS[:-2])
+
+
+def _race_result_values(result: RaceResult, now: datetime) -> Tuple:
+    """RaceResultを_RACE_RESULT_COLUMNSの順の値タプルに変換"""
+    return _get_race_result_fields(result) + (result.created_at or now, result.updated_at or now)
+
+
+def _dumps_json(value: Any) -> str:
+    """JSON文字列に変換（日時・Decimalなど標準で扱えない値は文字列化）"""
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(value, default=str, ensure_ascii=False)
+
+
+def _json_param(value: Any) -> Json:
+    """jsonbパラメータとして渡す（日時・Decimalは文字列化し、PostgreSQL側で列の型に変換させる）"""
+    return Json(value, dumps=_dumps_json)
+
+
+def _csv_field(value: Any) -> str:
+    """COPY (FORMAT csv) 用に値を変換（Noneは引用符なしの空文字=NULL、それ以外は引用符で囲む）"""
+    if value is None:
+        return ''
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class _CsvRowStream:
+    """行のイテレータをCOPY (FORMAT csv) 用のファイルとして読ませる（全行分のCSVを先に組み立てない）"""
+    
+    def __init__(self, rows: Iterable[Tuple]):
+        self._lines = (','.join(map(_csv_field, row)) + '\n' for row in rows)
+        self._buffer = ''
+    
+    def read(self, size: int = -1) -> str:
+        """最大size文字を返す（size < 0 なら残り全部）"""
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        for line in self._lines:
+            chunks.append(line)
+            length += len(line)
+            if 0 <= size <= length:
+                break
+        data = ''.join(chunks)
+        if 0 <= size < len(data):
+            data, self._buffer = data[:size], data[size:]
+        else:
+            self._buffer = ''
+        return data
+
+
+# 頻出クエリのサーバー側プリペアドステートメント（名前 -> 定義、パラメータ型はPostgreSQL側で推論）
+_PREPARED_STATEMENTS = {
+    'race_exists': "SELECT EXISTS (SELECT 1 FROM races WHERE race_id = $1)",
+    'horse_exists': "SELECT EXISTS (SELECT 1 FROM horses WHERE id = $1)",
+    'horse_upsert_basic': """
+        INSERT INTO horses (id, name_ja, created_at, updated_at)
+        VALUES ($1, $2, $3, $4)
+        ON CONFLICT (id) DO UPDATE SET
+            updated_at = EXCLUDED.updated_at
+        RETURNING (xmax = 0) AS inserted
+    """,
+    # パラメータはRaceの_race_row()の順
+    'race_upsert_basic': """
+        INSERT INTO races (
+            race_id, race_date, track_name, race_number, race_name,
+            distance, track_type, total_horses, grade, track_direction,
+            weather, track_condition, start_time, winning_time, pace,
+            prize_1st, race_class, race_conditions, created_at, updated_at
+        ) VALUES (
+            $1, $2, $3, $4, $5, $6, $7, $8, $9, $10,
+            $11, $12, $13, $14, $15, $16, $17, $18, $19, $20
+        )
+        ON CONFLICT (race_id) DO UPDATE SET
+            updated_at = EXCLUDED.updated_at
+    """,
+}
+
+
+class _PooledConnection(PGConnection):
+    """PREPARE済みのステートメント名を接続ごとに保持する接続クラス"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: Set[str] = set()
+
+
+def _execute_prepared(cursor, name: str, params: Tuple) -> None:
+    """プリペアドステートメントを実行（接続ごとに初回のみPREPAREする）"""
+    conn = cursor.connection
+    if name not in conn.prepared:
+        cursor.execute(f"PREPARE {name} AS {_PREPARED_STATEMENTS[name]}")
+        conn.prepared.add(name)
+    placeholders = ', '.join(['%s'] * len(params))
+    cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+
+
+# horse_data['birth_date'] の書式
+_BIRTH_DATE_FORMAT = '%Y-%m-%d'
+
+
+def _parse_birth_date(text: str) -> date:
+    """YYYY-MM-DD を日付に変換（ゼロ埋めされていない日付のみstrptimeで解析）"""
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return datetime.strptime(text, _BIRTH_DATE_FORMAT).date()
+
+# 存在を確認済みの馬IDを覚えておく上限（超えたら古いものから忘れる）
+_HORSE_CACHE_SIZE = 200_000
+
+
+class _BlockingConnectionPool(ThreadedConnectionPool):
+    """空きがないときにPoolErrorにせず、返却されるまで待つコネクションプール"""
+    
+    def __init__(self, minconn: int, maxconn: int, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self._slots = threading.BoundedSemaphore(maxconn)
+    
+    def getconn(self, key=None):
+        self._slots.acquire()
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+    
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+
+# プロセス内で共有するコネクションプール（接続先ごとに初回利用時に作成、fork後は作り直す）
+_pools: Dict[Tuple, _BlockingConnectionPool] = {}
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(connection_params: Dict[str, Any]) -> _BlockingConnectionPool:
+    """接続先のコネクションプールを取得（未作成またはfork後のプロセスなら新規作成）"""
+    global _pool_pid
+    
+    key = tuple(sorted(connection_params.items()))
+    pid = os.getpid()
+    pool = _pools.get(key)
+    if pool is not None and _pool_pid == pid:
+        return pool
+    
+    with _pool_lock:
+        if _pool_pid != pid:
+            # fork元のソケットは親プロセスのものなので閉じずに参照だけ捨てる
+            _pools.clear()
+            _pool_pid = pid
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _BlockingConnectionPool(
+                minconn=int(os.getenv('POSTGRES_POOL_MIN', '2')),
+                maxconn=int(os.getenv('POSTGRES_POOL_MAX', '20')),
+                connection_factory=_PooledConnection,
+                **connection_params
+            )
+            _pools[key] = pool
+        return pool
+
+
+@atexit.register
+def _close_pool():
+    """終了時にプールの接続を閉じる（fork元から引き継いだプールには触らない）"""
+    if _pool_pid != os.getpid():
+        return
+    for pool in _pools.values():
+        if not pool.closed:
+            pool.closeall()
+
+
 class PostgreSQLStorage:
     """PostgreSQL データベース操作クラス"""
     
-    def __init__(self):
-        """初期化"""
-        self.connection_params = {
-            'host': os.getenv('POSTGRES_HOST', 'localhost'),
-            'database': os.getenv('POSTGRES_DB', 'stallion_db'),
-            'user': os.getenv('POSTGRES_USER', 'stallion_user'),
-            'password': os.getenv('POSTGRES_PASSWORD'),
-            'port': os.getenv('POSTGRES_PORT', '5432')
-        }
+    def __init__(self, dsn: Optional[str] = None):
+        """
+        初期化
+        
+        Args:
+            dsn: 接続文字列（省略時は POSTGRES_* 環境変数のローカルDBに接続）
+        """
+        if dsn:
+            self.connection_params = {'dsn': dsn}
+        else:
+            self.connection_params = {
+                'host': os.getenv('POSTGRES_HOST', 'localhost'),
+                'database': os.getenv('POSTGRES_DB', 'stallion_db'),
+                'user': os.getenv('POSTGRES_USER', 'stallion_user'),
+                'password': os.getenv('POSTGRES_PASSWORD'),
+                'port': os.getenv('POSTGRES_PORT', '5432')
+            }
+        
+        # 存在を確認済み（または登録をコミット済み）の馬ID（LRU、並列挿入のスレッドから更新するのでロックで保護）
+        self._known_horse_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._horse_cache_lock = threading.Lock()
         
-        # 接続テスト
-        self._test_connection()
+        # 存在を確認済み（または登録をコミット済み）のレースID（存在する結果のみ保持するので無効化は不要）
+        self._known_race_ids: Set[str] = set()
+        
+        # batch() 中の接続と、コミット待ちの馬ID（スレッドごと）
+        self._local = threading.local()
+        
+        # upsert_complete_race() が未作成と分かったらFalse（sql/migrations/002）
+        self._has_upsert_function = True
+        
+        # 接続はここでは開かず、最初に使うときにプールから取得する
     
     def _test_connection(self):
-        """データベース接続テスト"""
+        """データベース接続テスト（初期化時には呼ばない。疎通を明示的に確認したいときに使う）"""
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
@@ -55,44 +553,178 @@ class PostgreSQLStorage:
     
     @contextmanager
     def get_connection(self):
-        """データベース接続のコンテキストマネージャー"""
+        """
+        データベース接続のコンテキストマネージャー（正常終了でコミット、例外でロールバック）
+        
+        batch() の中ではbatchの接続をそのまま使い、コミットはbatchの終了時にまとめて行う。
+        その場合の失敗はセーブポイントまで（この操作の分だけ）巻き戻す。
+        """
+        batch_conn = getattr(self._local, 'conn', None)
+        if batch_conn is not None:
+            with batch_conn.cursor() as cursor:
+                cursor.execute("SAVEPOINT storage_op")
+            try:
+                yield batch_conn
+            except Exception as e:
+                if not batch_conn.closed:
+                    self._rollback(batch_conn)
+                logger.error(f"Database connection error: {e}")
+                raise
+            with batch_conn.cursor() as cursor:
+                cursor.execute("RELEASE SAVEPOINT storage_op")
+            return
+        
+        pool = _get_pool(self.connection_params)
         conn = None
         try:
-            conn = psycopg2.connect(**self.connection_params)
+            conn = pool.getconn()
+            if conn.closed:
+                # 切断済みの接続は捨てて取り直す（問い合わせは発生しない）
+                pool.putconn(conn, close=True)
+                conn = pool.getconn()
             yield conn
+            conn.commit()
         except Exception as e:
-            if conn:
+            if conn and not conn.closed:
                 conn.rollback()
             logger.error(f"Database connection error: {e}")
             raise
         finally:
             if conn:
-                conn.close()
+                pool.putconn(conn, close=bool(conn.closed))
+    
+    def _rollback(self, conn):
+        """現在の操作を取り消す（batch() の中ではこの操作の開始時点まで、それ以外はトランザクション全体）"""
+        if getattr(self._local, 'conn', None) is conn:
+            with conn.cursor() as cursor:
+                cursor.execute("ROLLBACK TO SAVEPOINT storage_op")
+        else:
+            conn.rollback()
+    
+    @contextmanager
+    def batch(self, synchronous_commit: bool = True):
+        """
+        ブロック内の登録を1トランザクションにまとめるコンテキストマネージャー
+        
+        ブロック内のメソッド呼び出しは同じ接続を使い、正常終了時に1回だけコミットする。
+        個々のメソッドが失敗した場合はそのメソッドの分だけ取り消して続行する。
+        
+        Args:
+            synchronous_commit: FalseにするとコミットでWALのディスク書き込みを待たない
+                                （クラッシュ時に直前のコミットが失われる可能性がある）
+        
+        Example:
+            with storage.batch():
+                for race, results in items:
+                    storage.insert_race(race)
+                    storage.insert_race_results(results)
+        """
+        if getattr(self._local, 'conn', None) is not None:
+            # 入れ子の場合は外側のbatchにまとめる
+            yield
+            return
+        
+        pool = _get_pool(self.connection_params)
+        conn = pool.getconn()
+        self._local.conn = conn
+        self._local.pending_horse_ids = []
+        self._local.pending_race_ids = []
+        try:
+            if not synchronous_commit:
+                with conn.cursor() as cursor:
+                    cursor.execute("SET LOCAL synchronous_commit = off")
+            yield
+            conn.commit()
+            pending_horse_ids = self._local.pending_horse_ids
+            pending_race_ids = self._local.pending_race_ids
+            self._local.conn = None
+            self._remember_horses(pending_horse_ids)
+            self._remember_races(pending_race_ids)
+        except Exception as e:
+            if not conn.closed:
+                conn.rollback()
+            logger.error(f"Batch transaction rolled back: {e}")
+            raise
+        finally:
+            self._local.conn = None
+            self._local.pending_horse_ids = None
+            self._local.pending_race_ids = None
+            pool.putconn(conn, close=bool(conn.closed))
+    
+    def _remember_races(self, race_ids: Iterable[str]):
+        """存在が確定したレースIDをキャッシュに追加（batch() の中ではコミットまで保留）"""
+        if getattr(self._local, 'conn', None) is not None:
+            self._local.pending_race_ids.extend(race_ids)
+            return
+        self._known_race_ids.update(race_ids)
     
     def check_race_exists(self, race_id: str) -> bool:
-        """レースが既に存在するかチェック"""
+        """レースが既に存在するかチェック（存在を確認済みのレースはDBに問い合わせない）"""
+        if race_id in self._known_race_ids:
+            return True
+        
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute(
-                        "SELECT 1 FROM races WHERE race_id = %s LIMIT 1",
-                        (race_id,)
-                    )
-                    return cursor.fetchone() is not None
+                    _execute_prepared(cursor, 'race_exists', (race_id,))
+                    exists = cursor.fetchone()[0]
+            if exists:
+                self._remember_races((race_id,))
+            return exists
         except Exception as e:
             logger.error(f"Error checking race existence for {race_id}: {e}")
             return False
     
-    def check_horse_exists(self, horse_id: str) -> bool:
-        """馬が既に存在するかチェック"""
+    def get_existing_race_ids(self, race_ids: List[str]) -> Set[str]:
+        """指定したレースIDのうち既に存在するものを1クエリで取得（確認済みのIDは問い合わせない）"""
+        known = self._known_race_ids.intersection(race_ids)
+        unknown = [race_id for race_id in race_ids if race_id not in known]
+        if not unknown:
+            return known
+        
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(
-                        "SELECT 1 FROM horses WHERE id = %s LIMIT 1",
-                        (horse_id,)
+                        "SELECT race_id FROM races WHERE race_id = ANY(%s)",
+                        (unknown,)
                     )
-                    return cursor.fetchone() is not None
+                    found = {row[0] for row in cursor.fetchall()}
+            self._remember_races(found)
+            return known | found
+        except Exception as e:
+            logger.error(f"Error fetching existing race ids: {e}")
+            return set()
+    
+    def _remember_horses(self, horse_ids: Iterable[str]):
+        """存在が確定した馬IDをキャッシュに追加（batch() の中ではコミットまで保留）"""
+        if getattr(self._local, 'conn', None) is not None:
+            self._local.pending_horse_ids.extend(horse_ids)
+            return
+        
+        cache = self._known_horse_ids
+        with self._horse_cache_lock:
+            for horse_id in horse_ids:
+                cache[horse_id] = None
+                cache.move_to_end(horse_id)
+            while len(cache) > _HORSE_CACHE_SIZE:
+                cache.popitem(last=False)
+    
+    def check_horse_exists(self, horse_id: str) -> bool:
+        """馬が既に存在するかチェック（存在を確認済みの馬はDBに問い合わせない）"""
+        with self._horse_cache_lock:
+            if horse_id in self._known_horse_ids:
+                self._known_horse_ids.move_to_end(horse_id)
+                return True
+        
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    _execute_prepared(cursor, 'horse_exists', (horse_id,))
+                    exists = cursor.fetchone()[0]
+            if exists:
+                self._remember_horses((horse_id,))
+            return exists
         except Exception as e:
             logger.error(f"Error checking horse existence for {horse_id}: {e}")
             return False
@@ -102,15 +734,16 @@ class PostgreSQLStorage:
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute("""
-                        INSERT INTO horses (id, name_ja, created_at, updated_at)
-                        VALUES (%(id)s, %(name_ja)s, %(created_at)s, %(updated_at)s)
-                        ON CONFLICT (id) DO UPDATE SET
-                            updated_at = EXCLUDED.updated_at
-                    """, horse_data)
-                    conn.commit()
-                    logger.debug(f"Horse inserted/updated: {horse_data['id']} ({horse_data['name_ja']})")
-                    return True
+                    _execute_prepared(cursor, 'horse_upsert_basic', (
+                        horse_data['id'], horse_data['name_ja'],
+                        horse_data['created_at'], horse_data['updated_at']
+                    ))
+                    # xmax = 0 なら新規挿入（既存行の更新ではない）
+                    inserted = cursor.fetchone()[0]
+            
+            self._remember_horses((horse_data['id'],))
+            logger.debug("Horse %s: %s (%s)", 'inserted' if inserted else 'updated', horse_data['id'], horse_data['name_ja'])
+            return True
         except Exception as e:
             logger.error(f"Error inserting horse {horse_data.get('id', 'Unknown')}: {e}")
             return False
@@ -118,13 +751,23 @@ class PostgreSQLStorage:
     def insert_horse_full(self, horse_data: Dict[str, Any]) -> bool:
         """完全な馬情報を挿入・更新"""
         try:
+            # パラメータは接続を借りる前に組み立てる
+            birth_date_text = horse_data.get('birth_date')
+            profile = horse_data.get('profile')
+            params = {
+                'id': horse_data['id'],
+                'name_ja': horse_data['name_ja'],
+                'name_en': horse_data.get('name_en'),
+                'birth_date': _parse_birth_date(birth_date_text) if birth_date_text else None,
+                'sex': horse_data.get('sex'),
+                'sire_id': horse_data.get('sire_id'),
+                'dam_id': horse_data.get('dam_id'),
+                'maternal_grandsire_id': horse_data.get('maternal_grandsire_id'),
+                'profile': _json_param(profile) if profile else None
+            }
+            
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    # birth_dateの変換
-                    birth_date = None
-                    if horse_data.get('birth_date'):
-                        birth_date = datetime.strptime(horse_data['birth_date'], '%Y-%m-%d').date()
-                    
                     cursor.execute("""
                         INSERT INTO horses (
                             id, name_ja, name_en, birth_date, sex, 
@@ -145,20 +788,11 @@ class PostgreSQLStorage:
                             maternal_grandsire_id = EXCLUDED.maternal_grandsire_id,
                             profile = EXCLUDED.profile,
                             updated_at = NOW()
-                    """, {
-                        'id': horse_data['id'],
-                        'name_ja': horse_data['name_ja'],
-                        'name_en': horse_data.get('name_en'),
-                        'birth_date': birth_date,
-                        'sex': horse_data.get('sex'),
-                        'sire_id': horse_data.get('sire_id'),
-                        'dam_id': horse_data.get('dam_id'),
-                        'maternal_grandsire_id': horse_data.get('maternal_grandsire_id'),
-                        'profile': json.dumps(horse_data.get('profile')) if horse_data.get('profile') else None
-                    })
-                    conn.commit()
-                    logger.debug(f"Horse full data inserted/updated: {horse_data['id']}")
-                    return True
+                    """, params)
+            
+            self._remember_horses((horse_data['id'],))
+            logger.debug("Horse full data inserted/updated: %s", horse_data['id'])
+            return True
         except Exception as e:
             logger.error(f"Error inserting full horse data {horse_data.get('id', 'Unknown')}: {e}")
             return False
@@ -169,42 +803,30 @@ class PostgreSQLStorage:
             return False
         
         try:
-            saved_count = 0
+            rows = [
+                (
+                    relation['horse_a_id'],
+                    relation['horse_b_id'],
+                    relation['relation_type'],
+                    relation.get('children_ids')
+                )
+                for relation in relations
+            ]
             
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    for relation in relations:
-                        # 重複チェック
-                        cursor.execute("""
-                            SELECT id FROM horse_relations 
-                            WHERE horse_a_id = %s AND horse_b_id = %s AND relation_type = %s
-                        """, (
-                            relation['horse_a_id'], 
-                            relation['horse_b_id'], 
-                            relation['relation_type']
-                        ))
-                        
-                        existing = cursor.fetchone()
-                        
-                        if not existing:
-                            cursor.execute("""
-                                INSERT INTO horse_relations (
-                                    horse_a_id, horse_b_id, relation_type, children_ids, created_at
-                                )
-                                VALUES (%s, %s, %s, %s, NOW())
-                            """, (
-                                relation['horse_a_id'],
-                                relation['horse_b_id'], 
-                                relation['relation_type'],
-                                relation.get('children_ids')
-                            ))
-                            saved_count += 1
-                            logger.debug(f"Relation saved: {relation['relation_type']} ({relation['horse_a_id']} -> {relation['horse_b_id']})")
-                        else:
-                            logger.debug(f"Relation already exists: {relation['relation_type']}")
+                    # 既存の関係はユニークインデックス（horse_relations_uniq）で読み飛ばす
+                    inserted = execute_values(cursor, """
+                        INSERT INTO horse_relations (
+                            horse_a_id, horse_b_id, relation_type, children_ids, created_at
+                        )
+                        VALUES %s
+                        ON CONFLICT (horse_a_id, horse_b_id, relation_type) DO NOTHING
+                        RETURNING 1
+                    """, rows, template="(%s, %s, %s, %s, NOW())", page_size=1000, fetch=True)
                     
-                    conn.commit()
-                    logger.info(f"Saved {saved_count} relations")
+                    saved_count = len(inserted)
+                    logger.info("Saved %d relations (%d already existed)", saved_count, len(rows) - saved_count)
                     return True
             
         except Exception as e:
@@ -214,17 +836,18 @@ class PostgreSQLStorage:
     def insert_race(self, race: Race) -> bool:
         """レース基本情報を挿入"""
         try:
-            logger.info(f"Race Is: {race}")
+            logger.debug("Inserting race: %s", race.race_id)
             
             corner_positions_json = None
             lap_data_json = None
             
             if race.corner_positions:
-                corner_positions_json = json.dumps(race.corner_positions, ensure_ascii=False)
+                corner_positions_json = _dumps_json(race.corner_positions)
             
             if race.lap_data:
-                lap_data_json = json.dumps(race.lap_data, ensure_ascii=False)
+                lap_data_json = _dumps_json(race.lap_data)
             
+            now = datetime.now()
             race_data = {
                 'race_id': race.race_id,
                 'race_date': race.race_date,
@@ -246,8 +869,8 @@ class PostgreSQLStorage:
                 'race_conditions': race.race_conditions,
                 'corner_positions': corner_positions_json,
                 'lap_data': lap_data_json,
-                'created_at': race.created_at or datetime.now(),
-                'updated_at': race.updated_at or datetime.now()
+                'created_at': race.created_at or now,
+                'updated_at': race.updated_at or now
             }
             
             with self.get_connection() as conn:
@@ -287,10 +910,14 @@ class PostgreSQLStorage:
                             corner_positions = EXCLUDED.corner_positions,
                             lap_data = EXCLUDED.lap_data,
                             updated_at = EXCLUDED.updated_at
+                        RETURNING (xmax = 0) AS inserted
                     """, race_data)
-                    conn.commit()
-                    logger.debug(f"Race inserted/updated: {race.race_id} ({race.race_name})")
-                    return True
+                    # 事前の存在確認はせず、新規か既存の更新かは挿入結果から判定する
+                    inserted = cursor.fetchone()[0]
+            
+            self._remember_races((race.race_id,))
+            logger.debug("Race %s: %s (%s)", 'inserted' if inserted else 'updated', race.race_id, race.race_name)
+            return True
         except Exception as e:
             logger.error(f"Error inserting race {race.race_id}: {e}")
             return False
@@ -303,86 +930,47 @@ class PostgreSQLStorage:
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    # バッチインサート用のデータ準備
-                    insert_data = []
-                    for result in results:
-                        data = {
-                            'race_id': result.race_id,
-                            'horse_id': result.horse_id,
-                            'horse_name': result.horse_name,
-                            'bracket_number': result.bracket_number,
-                            'horse_number': result.horse_number,
-                            'age': result.age,
-                            'sex': result.sex,
-                            'jockey_weight': result.jockey_weight,
-                            'jockey_name': result.jockey_name,
-                            'trainer_name': result.trainer_name,
-                            'finish_position': result.finish_position,
-                            'jockey_id': result.jockey_id,
-                            'trainer_region': result.trainer_region,
-                            'trainer_id': result.trainer_id,
-                            'race_time': result.race_time,
-                            'time_diff': result.time_diff,
-                            'passing_order': result.passing_order,
-                            'last_3f': result.last_3f,
-                            'odds': result.odds,
-                            'popularity': result.popularity,
-                            'horse_weight': result.horse_weight,
-                            'weight_change': result.weight_change,
-                            'prize_money': result.prize_money,
-                            'owner_id': result.owner_id,
-                            'owner_name': result.owner_name,
-                            'created_at': result.created_at or datetime.now(),
-                            'updated_at': result.updated_at or datetime.now()
-                        }
-
-                        # 馬がすでに存在しない場合は追加
-                        if not self.check_horse_exists(result.horse_id):
-                            horse_data = {
-                                'id': result.horse_id,
-                                'name_ja': result.horse_name,
-                                'created_at': datetime.now(),
-                                'updated_at': datetime.now()
-                            }
-                            self.insert_horse_basic(horse_data)
-
-                        insert_data.append(data)
-                    
-                    # バッチインサート実行
-                    cursor.executemany("""
-                        INSERT INTO race_results (
-                            race_id, horse_id, horse_name, bracket_number, horse_number,
-                            age, sex, jockey_weight, jockey_name, trainer_name,
-                            finish_position, jockey_id, trainer_region, trainer_id,
-                            race_time, time_diff, passing_order, last_3f, odds,
-                            popularity, horse_weight, weight_change, prize_money,
-                            owner_id, owner_name, created_at, updated_at
-                        ) VALUES (
-                            %(race_id)s, %(horse_id)s, %(horse_name)s, %(bracket_number)s, %(horse_number)s,
-                            %(age)s, %(sex)s, %(jockey_weight)s, %(jockey_name)s, %(trainer_name)s,
-                            %(finish_position)s, %(jockey_id)s, %(trainer_region)s, %(trainer_id)s,
-                            %(race_time)s, %(time_diff)s, %(passing_order)s, %(last_3f)s, %(odds)s,
-                            %(popularity)s, %(horse_weight)s, %(weight_change)s, %(prize_money)s,
-                            %(owner_id)s, %(owner_name)s, %(created_at)s, %(updated_at)s
-                        )
-                        ON CONFLICT (race_id, horse_id) DO UPDATE SET
-                            updated_at = EXCLUDED.updated_at,
-                            finish_position = EXCLUDED.finish_position,
-                            race_time = EXCLUDED.race_time,
-                            odds = EXCLUDED.odds,
-                            popularity = EXCLUDED.popularity,
-                            horse_weight = EXCLUDED.horse_weight,
-                            weight_change = EXCLUDED.weight_change
-                    """, insert_data)
+                    # 未登録の馬をまとめて追加
+                    self._insert_horses_basic_with_cursor(cursor, results)
                     
-                    conn.commit()
-                    logger.debug(f"Race results inserted: {len(results)} records for race {results[0].race_id}")
-                    return True
+                    # 件数に応じてexecute_valuesかCOPYでまとめて投入
+                    self._upsert_race_results_with_cursor(cursor, results)
+            
+            self._remember_horses(result.horse_id for result in results)
+            logger.debug("Race results inserted: %d records for race %s", len(results), results[0].race_id)
+            return True
                     
         except Exception as e:
             logger.error(f"Error inserting race results: {e}")
             return False
     
+    def copy_race_results_overwrite(self, results: List[RaceResult]) -> bool:
+        """
+        レース結果をCOPYでマージ（既存行も全列を上書きし、未登録の馬の仮登録はしない）
+        
+        RaceStorageがSupabaseのDBに直接投入するときに使う（PostgRESTのupsertと同じ結果になる）。
+        """
+        if not results:
+            return True
+        
+        try:
+            now = datetime.now()
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    self._copy_merge_with_cursor(
+                        cursor, 'race_results', _RACE_RESULT_COLUMNS,
+                        (_race_result_values(result, now) for result in results),
+                        conflict_columns=('race_id', 'horse_id'),
+                        update_columns=_RACE_RESULT_OVERWRITE_COLUMNS
+                    )
+            
+            logger.debug("Race results copied: %d records", len(results))
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error copying race results: {e}")
+            return False
+    
     def insert_race_payouts(self, payouts: List[RacePayout]) -> bool:
         """払い戻し情報を一括挿入"""
         if not payouts:
@@ -391,37 +979,11 @@ class PostgreSQLStorage:
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    # バッチインサート用のデータ準備
-                    insert_data = []
-                    for payout in payouts:
-                        data = {
-                            'race_id': payout.race_id,
-                            'bet_type': payout.bet_type,
-                            'combination': payout.combination,
-                            'payout_amount': payout.payout_amount,
-                            'popularity': payout.popularity,
-                            'created_at': payout.created_at or datetime.now(),
-                            'updated_at': payout.updated_at or datetime.now()
-                        }
-                        insert_data.append(data)
-                    
-                    # バッチインサート実行
-                    cursor.executemany("""
-                        INSERT INTO race_payouts (
-                            race_id, bet_type, combination, payout_amount, popularity,
-                            created_at, updated_at
-                        ) VALUES (
-                            %(race_id)s, %(bet_type)s, %(combination)s, %(payout_amount)s, %(popularity)s,
-                            %(created_at)s, %(updated_at)s
-                        )
-                        ON CONFLICT (race_id, bet_type, combination) DO UPDATE SET
-                            payout_amount = EXCLUDED.payout_amount,
-                            popularity = EXCLUDED.popularity,
-                            updated_at = EXCLUDED.updated_at
-                    """, insert_data)
+                    if not self._insert_race_payouts_with_cursor(cursor, payouts):
+                        self._rollback(conn)
+                        return False
                     
-                    conn.commit()
-                    logger.debug(f"Race payouts inserted: {len(payouts)} records for race {payouts[0].race_id if payouts else 'unknown'}")
+                    logger.debug("Race payouts inserted: %d records for race %s", len(payouts), payouts[0].race_id)
                     return True
                     
         except Exception as e:
@@ -430,603 +992,672 @@ class PostgreSQLStorage:
     
     def insert_jockey(self, jockey: Jockey) -> bool:
         """騎手情報を挿入"""
+        logger.debug("Inserting jockey: %s", jockey.jockey_id)
+        return self.insert_jockeys([jockey])
+    
+    def insert_jockeys(self, jockeys: List[Jockey]) -> bool:
+        """騎手情報をまとめて挿入（1文のINSERT ... ON CONFLICT、同じIDは後勝ち）"""
+        if not jockeys:
+            return True
+        
         try:
-            logger.info(f"Jockey Is: {jockey}")
-            
-            yearly_stats_json = None
-            track_stats_json = None
-            distance_stats_json = None
-            
-            if jockey.yearly_stats:
-                yearly_stats_json = json.dumps(jockey.yearly_stats, ensure_ascii=False)
-            
-            if jockey.track_stats:
-                track_stats_json = json.dumps(jockey.track_stats, ensure_ascii=False)
-                
-            if jockey.distance_stats:
-                distance_stats_json = json.dumps(jockey.distance_stats, ensure_ascii=False)
-            
-            jockey_data = {
-                'jockey_id': jockey.jockey_id,
-                'name_ja': jockey.name_ja,
-                'name_en': jockey.name_en,
-                'birthdate': jockey.birthdate,
-                'region': jockey.region,
-                'license_type': jockey.license_type,
-                'trainer_name': jockey.trainer_name,
-                'debut_date': jockey.debut_date,
-                'status': jockey.status,
-                'weight': jockey.weight,
-                'height': jockey.height,
-                'total_races': jockey.total_races,
-                'wins': jockey.wins,
-                'seconds': jockey.seconds,
-                'thirds': jockey.thirds,
-                'win_rate': jockey.win_rate,
-                'show_rate': jockey.show_rate,
-                'total_prize_money': jockey.total_prize_money,
-                'yearly_stats': yearly_stats_json,
-                'track_stats': track_stats_json,
-                'distance_stats': distance_stats_json,
-                'created_at': jockey.created_at or datetime.now(),
-                'updated_at': jockey.updated_at or datetime.now()
-            }
+            now = datetime.now()
+            rows = {jockey.jockey_id: self._jockey_row(jockey, now) for jockey in jockeys}
             
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute("""
-                        INSERT INTO jockeys (
-                            jockey_id, name_ja, name_en, birthdate, region, license_type, trainer_name,
-                            debut_date, status, weight, height, total_races, wins,
-                            seconds, thirds, win_rate, show_rate, total_prize_money,
-                            yearly_stats, track_stats, distance_stats, created_at, updated_at
-                        ) VALUES (
-                            %(jockey_id)s, %(name_ja)s, %(name_en)s, %(birthdate)s, %(region)s, %(license_type)s, %(trainer_name)s,
-                            %(debut_date)s, %(status)s, %(weight)s, %(height)s, %(total_races)s, %(wins)s,
-                            %(seconds)s, %(thirds)s, %(win_rate)s, %(show_rate)s, %(total_prize_money)s,
-                            %(yearly_stats)s::jsonb, %(track_stats)s::jsonb, %(distance_stats)s::jsonb,
-                            %(created_at)s, %(updated_at)s
-                        )
-                        ON CONFLICT (jockey_id) DO UPDATE SET
-                            name_ja = EXCLUDED.name_ja,
-                            name_en = EXCLUDED.name_en,
-                            birthdate = EXCLUDED.birthdate,
-                            region = EXCLUDED.region,
-                            license_type = EXCLUDED.license_type,
-                            trainer_name = EXCLUDED.trainer_name,
-                            debut_date = EXCLUDED.debut_date,
-                            status = EXCLUDED.status,
-                            weight = EXCLUDED.weight,
-                            height = EXCLUDED.height,
-                            total_races = EXCLUDED.total_races,
-                            wins = EXCLUDED.wins,
-                            seconds = EXCLUDED.seconds,
-                            thirds = EXCLUDED.thirds,
-                            win_rate = EXCLUDED.win_rate,
-                            show_rate = EXCLUDED.show_rate,
-                            total_prize_money = EXCLUDED.total_prize_money,
-                            yearly_stats = EXCLUDED.yearly_stats,
-                            track_stats = EXCLUDED.track_stats,
-                            distance_stats = EXCLUDED.distance_stats,
-                            updated_at = EXCLUDED.updated_at
-                    """, jockey_data)
-                    conn.commit()
-                    logger.debug(f"Jockey inserted/updated: {jockey.jockey_id} ({jockey.name_ja})")
-                    return True
+                    execute_values(cursor, _JOCKEY_UPSERT_SQL, list(rows.values()),
+                                   template=_JOCKEY_VALUES_TEMPLATE, page_size=500)
+            
+            logger.debug("Jockeys inserted/updated: %d", len(rows))
+            return True
         except Exception as e:
-            logger.error(f"Error inserting jockey {jockey.jockey_id}: {e}")
+            logger.error(f"Error inserting jockeys ({len(jockeys)}): {e}")
             return False
-
+    
+    def _jockey_row(self, jockey: Jockey, now: datetime) -> Tuple:
+        """騎手情報の登録値（_JOCKEY_COLUMNSの順、jsonb列はJSON文字列に変換済み）"""
+        yearly_stats_json = None
+        track_stats_json = None
+        distance_stats_json = None
+        
+        if jockey.yearly_stats:
+            yearly_stats_json = _dumps_json(jockey.yearly_stats)
+        
+        if jockey.track_stats:
+            track_stats_json = _dumps_json(jockey.track_stats)
+            
+        if jockey.distance_stats:
+            distance_stats_json = _dumps_json(jockey.distance_stats)
+        
+        return (
+            jockey.jockey_id,
+            jockey.name_ja,
+            jockey.name_en,
+            jockey.birthdate,
+            jockey.region,
+            jockey.license_type,
+            jockey.trainer_name,
+            jockey.debut_date,
+            jockey.status,
+            jockey.weight,
+            jockey.height,
+            jockey.total_races,
+            jockey.wins,
+            jockey.seconds,
+            jockey.thirds,
+            jockey.win_rate,
+            jockey.show_rate,
+            jockey.total_prize_money,
+            yearly_stats_json,
+            track_stats_json,
+            distance_stats_json,
+            jockey.created_at or now,
+            jockey.updated_at or now
+        )
+    
     def insert_trainer(self, trainer: Trainer) -> bool:
         """調教師情報を挿入"""
+        logger.debug("Inserting trainer: %s", trainer.trainer_id)
+        return self.insert_trainers([trainer])
+    
+    def insert_trainers(self, trainers: List[Trainer]) -> bool:
+        """調教師情報をまとめて挿入（1文のINSERT ... ON CONFLICT、同じIDは後勝ち）"""
+        if not trainers:
+            return True
+        
         try:
-            logger.info(f"Trainer Is: {trainer}")
-            
-            yearly_stats_json = None
-            race_stats_json = None
-            track_stats_json = None
-            distance_stats_json = None
-            
-            if trainer.yearly_stats:
-                yearly_stats_json = json.dumps(trainer.yearly_stats, ensure_ascii=False)
-            
-            if trainer.race_stats:
-                race_stats_json = json.dumps(trainer.race_stats, ensure_ascii=False)
-            
-            if trainer.track_stats:
-                track_stats_json = json.dumps(trainer.track_stats, ensure_ascii=False)
-                
-            if trainer.distance_stats:
-                distance_stats_json = json.dumps(trainer.distance_stats, ensure_ascii=False)
-            
-            trainer_data = {
-                'trainer_id': trainer.trainer_id,
-                'name_ja': trainer.name_ja,
-                'name_en': trainer.name_en,
-                'birthdate': trainer.birthdate,
-                'region': trainer.region,
-                'license_type': trainer.license_type,
-                'debut_date': trainer.debut_date,
-                'status': trainer.status,
-                'total_races': trainer.total_races,
-                'wins': trainer.wins,
-                'seconds': trainer.seconds,
-                'thirds': trainer.thirds,
-                'win_rate': trainer.win_rate,
-                'second_rate': trainer.second_rate,
-                'show_rate': trainer.show_rate,
-                'total_prize_money': trainer.total_prize_money,
-                'yearly_stats': yearly_stats_json,
-                'race_stats': race_stats_json,
-                'track_stats': track_stats_json,
-                'distance_stats': distance_stats_json,
-                'created_at': trainer.created_at or datetime.now(),
-                'updated_at': trainer.updated_at or datetime.now()
-            }
+            now = datetime.now()
+            rows = {trainer.trainer_id: self._trainer_row(trainer, now) for trainer in trainers}
             
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute("""
-                        INSERT INTO trainers (
-                            trainer_id, name_ja, name_en, birthdate, region, license_type,
-                            debut_date, status, total_races, wins, seconds, thirds,
-                            win_rate, second_rate, show_rate, total_prize_money,
-                            yearly_stats, race_stats, track_stats, distance_stats,
-                            created_at, updated_at
-                        ) VALUES (
-                            %(trainer_id)s, %(name_ja)s, %(name_en)s, %(birthdate)s, %(region)s, %(license_type)s,
-                            %(debut_date)s, %(status)s, %(total_races)s, %(wins)s, %(seconds)s, %(thirds)s,
-                            %(win_rate)s, %(second_rate)s, %(show_rate)s, %(total_prize_money)s,
-                            %(yearly_stats)s::jsonb, %(race_stats)s::jsonb, %(track_stats)s::jsonb, %(distance_stats)s::jsonb,
-                            %(created_at)s, %(updated_at)s
-                        )
-                        ON CONFLICT (trainer_id) DO UPDATE SET
-                            name_ja = EXCLUDED.name_ja,
-                            name_en = EXCLUDED.name_en,
-                            birthdate = EXCLUDED.birthdate,
-                            region = EXCLUDED.region,
-                            license_type = EXCLUDED.license_type,
-                            debut_date = EXCLUDED.debut_date,
-                            status = EXCLUDED.status,
-                            total_races = EXCLUDED.total_races,
-                            wins = EXCLUDED.wins,
-                            seconds = EXCLUDED.seconds,
-                            thirds = EXCLUDED.thirds,
-                            win_rate = EXCLUDED.win_rate,
-                            second_rate = EXCLUDED.second_rate,
-                            show_rate = EXCLUDED.show_rate,
-                            total_prize_money = EXCLUDED.total_prize_money,
-                            yearly_stats = EXCLUDED.yearly_stats,
-                            race_stats = EXCLUDED.race_stats,
-                            track_stats = EXCLUDED.track_stats,
-                            distance_stats = EXCLUDED.distance_stats,
-                            updated_at = EXCLUDED.updated_at
-                    """, trainer_data)
-                    conn.commit()
-                    logger.debug(f"Trainer inserted/updated: {trainer.trainer_id} ({trainer.name_ja})")
-                    return True
+                    execute_values(cursor, _TRAINER_UPSERT_SQL, list(rows.values()),
+                                   template=_TRAINER_VALUES_TEMPLATE, page_size=500)
+            
+            logger.debug("Trainers inserted/updated: %d", len(rows))
+            return True
         except Exception as e:
-            logger.error(f"Error inserting trainer {trainer.trainer_id}: {e}")
+            logger.error(f"Error inserting trainers ({len(trainers)}): {e}")
             return False
-
+    
+    def _trainer_row(self, trainer: Trainer, now: datetime) -> Tuple:
+        """調教師情報の登録値（_TRAINER_COLUMNSの順、jsonb列はJSON文字列に変換済み）"""
+        yearly_stats_json = None
+        race_stats_json = None
+        track_stats_json = None
+        distance_stats_json = None
+        
+        if trainer.yearly_stats:
+            yearly_stats_json = _dumps_json(trainer.yearly_stats)
+        
+        if trainer.race_stats:
+            race_stats_json = _dumps_json(trainer.race_stats)
+        
+        if trainer.track_stats:
+            track_stats_json = _dumps_json(trainer.track_stats)
+            
+        if trainer.distance_stats:
+            distance_stats_json = _dumps_json(trainer.distance_stats)
+        
+        return (
+            trainer.trainer_id,
+            trainer.name_ja,
+            trainer.name_en,
+            trainer.birthdate,
+            trainer.region,
+            trainer.license_type,
+            trainer.debut_date,
+            trainer.status,
+            trainer.total_races,
+            trainer.wins,
+            trainer.seconds,
+            trainer.thirds,
+            trainer.win_rate,
+            trainer.second_rate,
+            trainer.show_rate,
+            trainer.total_prize_money,
+            yearly_stats_json,
+            race_stats_json,
+            track_stats_json,
+            distance_stats_json,
+            trainer.created_at or now,
+            trainer.updated_at or now
+        )
+    
     def insert_owner(self, owner: Owner) -> bool:
         """馬主情報を挿入"""
+        logger.debug("Inserting owner: %s", owner.owner_id)
+        return self.insert_owners([owner])
+    
+    def insert_owners(self, owners: List[Owner]) -> bool:
+        """馬主情報をまとめて挿入（1文のINSERT ... ON CONFLICT、同じIDは後勝ち）"""
+        if not owners:
+            return True
+        
         try:
-            logger.info(f"Owner Is: {owner}")
-            
-            yearly_stats_json = None
-            race_stats_json = None
-            track_stats_json = None
-            distance_stats_json = None
-            horse_list_json = None
-            
-            if owner.yearly_stats:
-                yearly_stats_json = json.dumps(owner.yearly_stats, ensure_ascii=False)
-            
-            if owner.race_stats:
-                race_stats_json = json.dumps(owner.race_stats, ensure_ascii=False)
+            now = datetime.now()
+            rows = {owner.owner_id: self._owner_row(owner, now) for owner in owners}
             
-            if owner.track_stats:
-                track_stats_json = json.dumps(owner.track_stats, ensure_ascii=False)
-                
-            if owner.distance_stats:
-                distance_stats_json = json.dumps(owner.distance_stats, ensure_ascii=False)
-                
-            if owner.horse_list:
-                horse_list_json = json.dumps(owner.horse_list, ensure_ascii=False)
-            
-            owner_data = {
-                'owner_id': owner.owner_id,
-                'name_ja': owner.name_ja,
-                'name_en': owner.name_en,
-                'birthdate': owner.birthdate,
-                'owner_type': owner.owner_type,
-                'license_date': owner.license_date,
-                'status': owner.status,
-                'total_races': owner.total_races,
-                'wins': owner.wins,
-                'seconds': owner.seconds,
-                'thirds': owner.thirds,
-                'win_rate': owner.win_rate,
-                'second_rate': owner.second_rate,
-                'show_rate': owner.show_rate,
-                'total_prize_money': owner.total_prize_money,
-                'total_horses': owner.total_horses,
-                'active_horses': owner.active_horses,
-                'retired_horses': owner.retired_horses,
-                'stakes_wins': owner.stakes_wins,
-                'grade1_wins': owner.grade1_wins,
-                'yearly_stats': yearly_stats_json,
-                'race_stats': race_stats_json,
-                'track_stats': track_stats_json,
-                'distance_stats': distance_stats_json,
-                'horse_list': horse_list_json,
-                'created_at': owner.created_at or datetime.now(),
-                'updated_at': owner.updated_at or datetime.now()
-            }
+            if len(rows) > _ENTITY_COPY_THRESHOLD:
+                self._copy_merge_entity_rows('owners', _OWNER_COLUMNS, list(rows.values()))
+                logger.debug("Owners copied/merged: %d", len(rows))
+                return True
             
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute("""
-                        INSERT INTO owners (
-                            owner_id, name_ja, name_en, birthdate, owner_type, license_date,
-                            status, total_races, wins, seconds, thirds,
-                            win_rate, second_rate, show_rate, total_prize_money,
-                            total_horses, active_horses, retired_horses, stakes_wins, grade1_wins,
-                            yearly_stats, race_stats, track_stats, distance_stats, horse_list,
-                            created_at, updated_at
-                        ) VALUES (
-                            %(owner_id)s, %(name_ja)s, %(name_en)s, %(birthdate)s, %(owner_type)s, %(license_date)s,
-                            %(status)s, %(total_races)s, %(wins)s, %(seconds)s, %(thirds)s,
-                            %(win_rate)s, %(second_rate)s, %(show_rate)s, %(total_prize_money)s,
-                            %(total_horses)s, %(active_horses)s, %(retired_horses)s, %(stakes_wins)s, %(grade1_wins)s,
-                            %(yearly_stats)s::jsonb, %(race_stats)s::jsonb, %(track_stats)s::jsonb, %(distance_stats)s::jsonb, %(horse_list)s::jsonb,
-                            %(created_at)s, %(updated_at)s
-                        )
-                        ON CONFLICT (owner_id) DO UPDATE SET
-                            name_ja = EXCLUDED.name_ja,
-                            name_en = EXCLUDED.name_en,
-                            birthdate = EXCLUDED.birthdate,
-                            owner_type = EXCLUDED.owner_type,
-                            license_date = EXCLUDED.license_date,
-                            status = EXCLUDED.status,
-                            total_races = EXCLUDED.total_races,
-                            wins = EXCLUDED.wins,
-                            seconds = EXCLUDED.seconds,
-                            thirds = EXCLUDED.thirds,
-                            win_rate = EXCLUDED.win_rate,
-                            second_rate = EXCLUDED.second_rate,
-                            show_rate = EXCLUDED.show_rate,
-                            total_prize_money = EXCLUDED.total_prize_money,
-                            total_horses = EXCLUDED.total_horses,
-                            active_horses = EXCLUDED.active_horses,
-                            retired_horses = EXCLUDED.retired_horses,
-                            stakes_wins = EXCLUDED.stakes_wins,
-                            grade1_wins = EXCLUDED.grade1_wins,
-                            yearly_stats = EXCLUDED.yearly_stats,
-                            race_stats = EXCLUDED.race_stats,
-                            track_stats = EXCLUDED.track_stats,
-                            distance_stats = EXCLUDED.distance_stats,
-                            horse_list = EXCLUDED.horse_list,
-                            updated_at = EXCLUDED.updated_at
-                    """, owner_data)
-                    conn.commit()
-                    logger.debug(f"Owner inserted/updated: {owner.owner_id} ({owner.name_ja})")
-                    return True
+                    execute_values(cursor, _OWNER_UPSERT_SQL, list(rows.values()),
+                                   template=_OWNER_VALUES_TEMPLATE, page_size=500)
+            
+            logger.debug("Owners inserted/updated: %d", len(rows))
+            return True
         except Exception as e:
-            logger.error(f"Error inserting owner {owner.owner_id}: {e}")
+            logger.error(f"Error inserting owners ({len(owners)}): {e}")
             return False
-
+    
+    def _owner_row(self, owner: Owner, now: datetime) -> Tuple:
+        """馬主情報の登録値（_OWNER_COLUMNSの順、jsonb列はJSON文字列に変換済み）"""
+        yearly_stats_json = None
+        race_stats_json = None
+        track_stats_json = None
+        distance_stats_json = None
+        horse_list_json = None
+        
+        if owner.yearly_stats:
+            yearly_stats_json = _dumps_json(owner.yearly_stats)
+        
+        if owner.race_stats:
+            race_stats_json = _dumps_json(owner.race_stats)
+        
+        if owner.track_stats:
+            track_stats_json = _dumps_json(owner.track_stats)
+            
+        if owner.distance_stats:
+            distance_stats_json = _dumps_json(owner.distance_stats)
+            
+        if owner.horse_list:
+            horse_list_json = _dumps_json(owner.horse_list)
+        
+        return (
+            owner.owner_id,
+            owner.name_ja,
+            owner.name_en,
+            owner.birthdate,
+            owner.owner_type,
+            owner.license_date,
+            owner.status,
+            owner.total_races,
+            owner.wins,
+            owner.seconds,
+            owner.thirds,
+            owner.win_rate,
+            owner.second_rate,
+            owner.show_rate,
+            owner.total_prize_money,
+            owner.total_horses,
+            owner.active_horses,
+            owner.retired_horses,
+            owner.stakes_wins,
+            owner.grade1_wins,
+            yearly_stats_json,
+            race_stats_json,
+            track_stats_json,
+            distance_stats_json,
+            horse_list_json,
+            owner.created_at or now,
+            owner.updated_at or now
+        )
+    
     def insert_breeder(self, breeder: Breeder) -> bool:
         """生産者情報を挿入"""
+        logger.debug("Inserting breeder: %s", breeder.breeder_id)
+        return self.insert_breeders([breeder])
+    
+    def insert_breeders(self, breeders: List[Breeder]) -> bool:
+        """生産者情報をまとめて挿入（1文のINSERT ... ON CONFLICT、同じIDは後勝ち）"""
+        if not breeders:
+            return True
+        
         try:
-            logger.info(f"Breeder Is: {breeder}")
+            now = datetime.now()
+            rows = {breeder.breeder_id: self._breeder_row(breeder, now) for breeder in breeders}
             
-            yearly_stats_json = None
-            race_stats_json = None
-            track_stats_json = None
-            distance_stats_json = None
-            produced_horses_json = None
-            stallion_stats_json = None
+            if len(rows) > _ENTITY_COPY_THRESHOLD:
+                self._copy_merge_entity_rows('breeders', _BREEDER_COLUMNS, list(rows.values()))
+                logger.debug("Breeders copied/merged: %d", len(rows))
+                return True
             
-            if breeder.yearly_stats:
-                yearly_stats_json = json.dumps(breeder.yearly_stats, ensure_ascii=False)
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    execute_values(cursor, _BREEDER_UPSERT_SQL, list(rows.values()),
+                                   template=_BREEDER_VALUES_TEMPLATE, page_size=500)
             
-            if breeder.race_stats:
-                race_stats_json = json.dumps(breeder.race_stats, ensure_ascii=False)
+            logger.debug("Breeders inserted/updated: %d", len(rows))
+            return True
+        except Exception as e:
+            logger.error(f"Error inserting breeders ({len(breeders)}): {e}")
+            return False
+    
+    def _copy_merge_entity_rows(self, table: str, columns: Tuple[str, ...], rows: List[Tuple]):
+        """
+        _owner_row / _breeder_row の行をCOPYでステージングテーブルに流し込み、1文でマージ
+        
+        先頭列をキーとし、競合時は内容が変わった行だけキーとcreated_at以外を更新する（execute_values版と同じ）。
+        """
+        update_columns = tuple(column for column in columns[1:] if column != 'created_at')
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                self._copy_merge_with_cursor(
+                    cursor, table, columns, rows,
+                    conflict_columns=columns[:1],
+                    update_columns=update_columns,
+                    update_where=_changed_condition(table, update_columns[:-1])
+                )
+    
+    def _breeder_row(self, breeder: Breeder, now: datetime) -> Tuple:
+        """生産者情報の登録値（_BREEDER_COLUMNSの順、jsonb列はJSON文字列に変換済み）"""
+        yearly_stats_json = None
+        race_stats_json = None
+        track_stats_json = None
+        distance_stats_json = None
+        produced_horses_json = None
+        stallion_stats_json = None
+        
+        if breeder.yearly_stats:
+            yearly_stats_json = _dumps_json(breeder.yearly_stats)
+        
+        if breeder.race_stats:
+            race_stats_json = _dumps_json(breeder.race_stats)
+        
+        if breeder.track_stats:
+            track_stats_json = _dumps_json(breeder.track_stats)
             
-            if breeder.track_stats:
-                track_stats_json = json.dumps(breeder.track_stats, ensure_ascii=False)
-                
-            if breeder.distance_stats:
-                distance_stats_json = json.dumps(breeder.distance_stats, ensure_ascii=False)
-                
-            if breeder.produced_horses:
-                produced_horses_json = json.dumps(breeder.produced_horses, ensure_ascii=False)
-                
-            if breeder.stallion_stats:
-                stallion_stats_json = json.dumps(breeder.stallion_stats, ensure_ascii=False)
+        if breeder.distance_stats:
+            distance_stats_json = _dumps_json(breeder.distance_stats)
             
-            breeder_data = {
-                'breeder_id': breeder.breeder_id,
-                'name_ja': breeder.name_ja,
-                'name_en': breeder.name_en,
-                'established_date': breeder.established_date,
-                'location': breeder.location,
-                'breeder_type': breeder.breeder_type,
-                'status': breeder.status,
-                'total_races': breeder.total_races,
-                'wins': breeder.wins,
-                'seconds': breeder.seconds,
-                'thirds': breeder.thirds,
-                'win_rate': breeder.win_rate,
-                'second_rate': breeder.second_rate,
-                'show_rate': breeder.show_rate,
-                'total_prize_money': breeder.total_prize_money,
-                'total_horses_produced': breeder.total_horses_produced,
-                'active_horses': breeder.active_horses,
-                'retired_horses': breeder.retired_horses,
-                'stakes_wins': breeder.stakes_wins,
-                'grade1_wins': breeder.grade1_wins,
-                'debut_horses': breeder.debut_horses,
-                'yearly_stats': yearly_stats_json,
-                'race_stats': race_stats_json,
-                'track_stats': track_stats_json,
-                'distance_stats': distance_stats_json,
-                'produced_horses': produced_horses_json,
-                'stallion_stats': stallion_stats_json,
-                'created_at': breeder.created_at or datetime.now(),
-                'updated_at': breeder.updated_at or datetime.now()
-            }
+        if breeder.produced_horses:
+            produced_horses_json = _dumps_json(breeder.produced_horses)
             
+        if breeder.stallion_stats:
+            stallion_stats_json = _dumps_json(breeder.stallion_stats)
+        
+        return (
+            breeder.breeder_id,
+            breeder.name_ja,
+            breeder.name_en,
+            breeder.established_date,
+            breeder.location,
+            breeder.breeder_type,
+            breeder.status,
+            breeder.total_races,
+            breeder.wins,
+            breeder.seconds,
+            breeder.thirds,
+            breeder.win_rate,
+            breeder.second_rate,
+            breeder.show_rate,
+            breeder.total_prize_money,
+            breeder.total_horses_produced,
+            breeder.active_horses,
+            breeder.retired_horses,
+            breeder.stakes_wins,
+            breeder.grade1_wins,
+            breeder.debut_horses,
+            yearly_stats_json,
+            race_stats_json,
+            track_stats_json,
+            distance_stats_json,
+            produced_horses_json,
+            stallion_stats_json,
+            breeder.created_at or now,
+            breeder.updated_at or now
+        )
+    
+    def insert_complete_race_data(self, race: Race, results: List[RaceResult],
+                                  payouts: Optional[List[RacePayout]] = None) -> bool:
+        """レース情報・結果・払い戻しを1つの接続・トランザクションで挿入"""
+        try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute("""
-                        INSERT INTO breeders (
-                            breeder_id, name_ja, name_en, established_date, location, breeder_type,
-                            status, total_races, wins, seconds, thirds,
-                            win_rate, second_rate, show_rate, total_prize_money,
-                            total_horses_produced, active_horses, retired_horses, stakes_wins, grade1_wins, debut_horses,
-                            yearly_stats, race_stats, track_stats, distance_stats, produced_horses, stallion_stats,
-                            created_at, updated_at
-                        ) VALUES (
-                            %(breeder_id)s, %(name_ja)s, %(name_en)s, %(established_date)s, %(location)s, %(breeder_type)s,
-                            %(status)s, %(total_races)s, %(wins)s, %(seconds)s, %(thirds)s,
-                            %(win_rate)s, %(second_rate)s, %(show_rate)s, %(total_prize_money)s,
-                            %(total_horses_produced)s, %(active_horses)s, %(retired_horses)s, %(stakes_wins)s, %(grade1_wins)s, %(debut_horses)s,
-                            %(yearly_stats)s::jsonb, %(race_stats)s::jsonb, %(track_stats)s::jsonb, %(distance_stats)s::jsonb, %(produced_horses)s::jsonb, %(stallion_stats)s::jsonb,
-                            %(created_at)s, %(updated_at)s
-                        )
-                        ON CONFLICT (breeder_id) DO UPDATE SET
-                            name_ja = EXCLUDED.name_ja,
-                            name_en = EXCLUDED.name_en,
-                            established_date = EXCLUDED.established_date,
-                            location = EXCLUDED.location,
-                            breeder_type = EXCLUDED.breeder_type,
-                            status = EXCLUDED.status,
-                            total_races = EXCLUDED.total_races,
-                            wins = EXCLUDED.wins,
-                            seconds = EXCLUDED.seconds,
-                            thirds = EXCLUDED.thirds,
-                            win_rate = EXCLUDED.win_rate,
-                            second_rate = EXCLUDED.second_rate,
-                            show_rate = EXCLUDED.show_rate,
-                            total_prize_money = EXCLUDED.total_prize_money,
-                            total_horses_produced = EXCLUDED.total_horses_produced,
-                            active_horses = EXCLUDED.active_horses,
-                            retired_horses = EXCLUDED.retired_horses,
-                            stakes_wins = EXCLUDED.stakes_wins,
-                            grade1_wins = EXCLUDED.grade1_wins,
-                            debut_horses = EXCLUDED.debut_horses,
-                            yearly_stats = EXCLUDED.yearly_stats,
-                            race_stats = EXCLUDED.race_stats,
-                            track_stats = EXCLUDED.track_stats,
-                            distance_stats = EXCLUDED.distance_stats,
-                            produced_horses = EXCLUDED.produced_horses,
-                            stallion_stats = EXCLUDED.stallion_stats,
-                            updated_at = EXCLUDED.updated_at
-                    """, breeder_data)
-                    conn.commit()
-                    logger.debug(f"Breeder inserted/updated: {breeder.breeder_id} ({breeder.name_ja})")
-                    return True
+                    # レース・出走馬・結果をサーバー側の関数で1回の呼び出しにまとめて登録
+                    if not self._upsert_complete_race_with_cursor(cursor, race, results):
+                        # 関数が未作成の場合は複数文で登録
+                        self._rollback(conn)
+                        
+                        # 1. レース基本情報挿入
+                        if not self._insert_race_with_cursor(cursor, race):
+                            self._rollback(conn)
+                            return False
+                        
+                        # 2. 未登録の馬をまとめて追加
+                        self._insert_horses_basic_with_cursor(cursor, results)
+                        
+                        # 3. レース結果挿入
+                        if not self._insert_race_results_with_cursor(cursor, results):
+                            self._rollback(conn)
+                            return False
+                    
+                    # 払い戻し情報も同じトランザクションで挿入
+                    if payouts and not self._insert_race_payouts_with_cursor(cursor, payouts):
+                        self._rollback(conn)
+                        return False
+            
+            self._remember_horses(result.horse_id for result in results)
+            self._remember_races((race.race_id,))
+            logger.info(f"Complete race data inserted successfully: {race.race_id}")
+            return True
+                    
         except Exception as e:
-            logger.error(f"Error inserting breeder {breeder.breeder_id}: {e}")
+            logger.error(f"Error inserting complete race data for {race.race_id}: {e}")
             return False
+    
+    def insert_complete_race_data_bulk(self, items: List[Tuple[Race, List[RaceResult], List[RacePayout]]],
+                                       max_workers: Optional[int] = None) -> Tuple[int, int]:
+        """
+        複数レースの情報・結果・払い戻しを並列に挿入（レースごとに別の接続・トランザクション）
+        
+        プールに空きがなければ接続が返却されるまで待つ。batch() の中から呼んだ場合は
+        batchのトランザクションに含めるため、並列にせず呼び出し元のスレッドで順に挿入する。
+        
+        Args:
+            items: (レース, 結果リスト, 払い戻しリスト) のリスト
+            max_workers: 同時実行数（省略時・プールの最大接続数を超える場合はプールの最大接続数）
+            
+        Returns:
+            Tuple[int, int]: (成功件数, 失敗件数)
+        """
+        if not items:
+            return 0, 0
+        
+        success_count = 0
+        if getattr(self._local, 'conn', None) is not None:
+            for race, results, payouts in items:
+                if self.insert_complete_race_data(race, results, payouts):
+                    success_count += 1
+            error_count = len(items) - success_count
+            logger.info(f"Complete race data bulk insert finished in batch: {success_count} success, {error_count} failed")
+            return success_count, error_count
+        
+        maxconn = _get_pool(self.connection_params).maxconn
+        max_workers = min(max_workers or maxconn, maxconn)
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            futures = [
+                executor.submit(self.insert_complete_race_data, race, results, payouts)
+                for race, results, payouts in items
+            ]
+            for future in as_completed(futures):
+                if future.result():
+                    success_count += 1
+        
+        error_count = len(items) - success_count
+        logger.info(f"Complete race data bulk insert finished: {success_count} success, {error_count} failed")
+        return success_count, error_count
+    
+    def insert_complete_race_data_batch(self, items: List[Tuple[Race, List[RaceResult], List[RacePayout]]]) -> bool:
+        """複数レースの情報・結果・払い戻しを1トランザクションで一括挿入"""
+        if not items:
+            return True
         
-    def insert_complete_race_data(self, race: Race, results: List[RaceResult]) -> bool:
-        """レース情報と結果を一括で挿入（トランザクション）"""
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    # トランザクション開始（自動）
+                    all_results: List[RaceResult] = []
+                    all_payouts: List[RacePayout] = []
                     
                     # 1. レース基本情報挿入
-                    if not self._insert_race_with_cursor(cursor, race):
-                        conn.rollback()
-                        return False
+                    for race, results, payouts in items:
+                        if not self._insert_race_with_cursor(cursor, race):
+                            self._rollback(conn)
+                            return False
+                        all_results.extend(results)
+                        all_payouts.extend(payouts)
                     
-                    # 2. 馬情報確認・追加
-                    horses_processed = set()
-                    for result in results:
-                        if result.horse_id not in horses_processed:
-                            if not self.check_horse_exists(result.horse_id):
-                                horse_data = {
-                                    'id': result.horse_id,
-                                    'name_ja': result.horse_name,
-                                    'created_at': datetime.now(),
-                                    'updated_at': datetime.now()
-                                }
-                                if not self._insert_horse_with_cursor(cursor, horse_data):
-                                    logger.warning(f"Failed to insert horse: {result.horse_id}")
-                            horses_processed.add(result.horse_id)
+                    # 2. 未登録の馬をまとめて追加
+                    self._insert_horses_basic_with_cursor(cursor, all_results)
                     
                     # 3. レース結果挿入
-                    if not self._insert_race_results_with_cursor(cursor, results):
-                        conn.rollback()
+                    if not self._insert_race_results_with_cursor(cursor, all_results):
+                        self._rollback(conn)
                         return False
                     
-                    # 全て成功した場合にコミット
-                    conn.commit()
-                    logger.info(f"Complete race data inserted successfully: {race.race_id}")
-                    return True
+                    # 4. 払い戻し情報挿入
+                    if not self._insert_race_payouts_with_cursor(cursor, all_payouts):
+                        self._rollback(conn)
+                        return False
+            
+            self._remember_horses(result.horse_id for result in all_results)
+            self._remember_races(race.race_id for race, _, _ in items)
+            logger.info(f"Complete race data batch inserted successfully: {len(items)} races")
+            return True
                     
         except Exception as e:
-            logger.error(f"Error inserting complete race data for {race.race_id}: {e}")
+            logger.error(f"Error inserting complete race data batch: {e}")
+            return False
+    
+    def _race_row(self, race: Race, now: datetime) -> Dict[str, Any]:
+        """races への登録値（_insert_race_with_cursor / upsert_complete_race 共通）"""
+        return {
+            'race_id': race.race_id,
+            'race_date': race.race_date,
+            'track_name': race.track_name,
+            'race_number': race.race_number,
+            'race_name': race.race_name,
+            'distance': race.distance,
+            'track_type': race.track_type,
+            'total_horses': race.total_horses,
+            'grade': race.grade,
+            'track_direction': race.track_direction,
+            'weather': race.weather,
+            'track_condition': race.track_condition,
+            'start_time': race.start_time,
+            'winning_time': race.winning_time,
+            'pace': race.pace,
+            'prize_1st': race.prize_1st,
+            'race_class': race.race_class,
+            'race_conditions': race.race_conditions,
+            'created_at': race.created_at or now,
+            'updated_at': race.updated_at or now
+        }
+    
+    def _upsert_complete_race_with_cursor(self, cursor, race: Race, results: List[RaceResult]) -> bool:
+        """
+        upsert_complete_race() でレース・出走馬・結果を登録（トランザクション内用）
+        
+        Returns:
+            bool: 関数で登録できた場合True、関数が未作成の場合False（以後このインスタンスでは呼ばない）
+        """
+        if not self._has_upsert_function:
+            return False
+        
+        now = datetime.now()
+        result_rows = [dict(zip(_RACE_RESULT_COLUMNS, _race_result_values(result, now))) for result in results]
+        try:
+            cursor.execute(
+                "SELECT upsert_complete_race(%s, %s)",
+                (_json_param(self._race_row(race, now)), _json_param(result_rows))
+            )
+            return True
+        except UndefinedFunction:
+            self._has_upsert_function = False
+            logger.warning("upsert_complete_race() is not defined; apply sql/migrations/002_upsert_complete_race.sql")
             return False
     
     def _insert_race_with_cursor(self, cursor, race: Race) -> bool:
         """カーソルを使ったレース挿入（トランザクション内用）"""
         try:
-            distance_int = int(race.distance) if isinstance(race.distance, str) and race.distance.isdigit() else 0
-            
-            race_data = {
-                'race_id': race.race_id,
-                'race_date': race.race_date,
-                'track_name': race.track_name,
-                'race_number': race.race_number,
-                'race_name': race.race_name,
-                'distance': distance_int,
-                'track_type': race.track_type,
-                'total_horses': race.total_horses,
-                'grade': race.grade,
-                'track_direction': race.track_direction,
-                'weather': race.weather,
-                'track_condition': race.track_condition,
-                'start_time': race.start_time,
-                'winning_time': race.winning_time,
-                'pace': race.pace,
-                'prize_1st': race.prize_1st,
-                'race_class': race.race_class,
-                'race_conditions': race.race_conditions,
-                'created_at': race.created_at or datetime.now(),
-                'updated_at': race.updated_at or datetime.now()
-            }
-            
-            cursor.execute("""
-                INSERT INTO races (
-                    race_id, race_date, track_name, race_number, race_name,
-                    distance, track_type, total_horses, grade, track_direction,
-                    weather, track_condition, start_time, winning_time, pace,
-                    prize_1st, race_class, race_conditions, created_at, updated_at
-                ) VALUES (
-                    %(race_id)s, %(race_date)s, %(track_name)s, %(race_number)s, %(race_name)s,
-                    %(distance)s, %(track_type)s, %(total_horses)s, %(grade)s, %(track_direction)s,
-                    %(weather)s, %(track_condition)s, %(start_time)s, %(winning_time)s, %(pace)s,
-                    %(prize_1st)s, %(race_class)s, %(race_conditions)s, %(created_at)s, %(updated_at)s
-                )
-                ON CONFLICT (race_id) DO UPDATE SET
-                    updated_at = EXCLUDED.updated_at
-            """, race_data)
+            _execute_prepared(cursor, 'race_upsert_basic', tuple(self._race_row(race, datetime.now()).values()))
             return True
         except Exception as e:
             logger.error(f"Error inserting race with cursor: {e}")
             return False
     
-    def _insert_horse_with_cursor(self, cursor, horse_data: Dict[str, Any]) -> bool:
-        """カーソルを使った馬挿入（トランザクション内用）"""
+    def _insert_horses_basic_with_cursor(self, cursor, results: List[RaceResult]) -> int:
+        """
+        レース結果に出てくる馬を1文でまとめて登録（既存の馬はそのまま、確認済みの馬は送らない、トランザクション内用）
+        
+        Returns:
+            int: 新規に登録した馬の数
+        """
+        now = datetime.now()
+        with self._horse_cache_lock:
+            horse_rows = {
+                result.horse_id: (result.horse_id, result.horse_name, now, now)
+                for result in results
+                if result.horse_id not in self._known_horse_ids
+            }
+        if not horse_rows:
+            return 0
+        
+        # 存在確認のSELECTはせず、挿入できた行だけをRETURNINGで受け取る
+        inserted = execute_values(cursor, """
+            INSERT INTO horses (id, name_ja, created_at, updated_at)
+            VALUES %s
+            ON CONFLICT (id) DO NOTHING
+            RETURNING id
+        """, list(horse_rows.values()), page_size=1000, fetch=True)
+        logger.debug("New horses registered: %d / %d", len(inserted), len(horse_rows))
+        return len(inserted)
+    
+    def _insert_race_results_with_cursor(self, cursor, results: List[RaceResult]) -> bool:
+        """カーソルを使ったレース結果挿入（トランザクション内用）"""
         try:
-            cursor.execute("""
-                INSERT INTO horses (id, name_ja, created_at, updated_at)
-                VALUES (%(id)s, %(name_ja)s, %(created_at)s, %(updated_at)s)
-                ON CONFLICT (id) DO UPDATE SET
-                    updated_at = EXCLUDED.updated_at
-            """, horse_data)
+            self._upsert_race_results_with_cursor(cursor, results)
             return True
         except Exception as e:
-            logger.error(f"Error inserting horse with cursor: {e}")
+            logger.error(f"Error inserting race results with cursor: {e}")
             return False
     
-    def _insert_race_results_with_cursor(self, cursor, results: List[RaceResult]) -> bool:
-        """カーソルを使ったレース結果挿入（トランザクション内用）"""
+    def _upsert_race_results_with_cursor(self, cursor, results: List[RaceResult]) -> None:
+        """件数に応じてexecute_valuesかCOPYでレース結果を登録（失敗時は例外を送出）"""
+        if not results:
+            return
+        
+        if len(results) > _RACE_RESULT_COPY_THRESHOLD:
+            # 過去データの一括投入など件数が多い場合はCOPYで流し込む
+            self._copy_race_results_with_cursor(cursor, results)
+            return
+        
+        # 1レース分程度ならステージングテーブルを使わず1文で登録する（同一キーは後勝ち）
+        now = datetime.now()
+        rows = {(result.race_id, result.horse_id): _race_result_values(result, now) for result in results}
+        execute_values(cursor, _RACE_RESULT_UPSERT_SQL, list(rows.values()), page_size=1000)
+    
+    def _copy_race_results_with_cursor(self, cursor, results: List[RaceResult]) -> None:
+        """レース結果をCOPYでステージングテーブルに流し込み、1回のINSERT ... SELECTでマージ"""
+        if not results:
+            return
+        
+        now = datetime.now()
+        self._copy_merge_with_cursor(
+            cursor, 'race_results', _RACE_RESULT_COLUMNS,
+            (_race_result_values(result, now) for result in results),
+            conflict_columns=('race_id', 'horse_id'),
+            update_columns=_RACE_RESULT_UPDATE_COLUMNS
+        )
+    
+    def _copy_merge_with_cursor(self, cursor, table: str, columns: Tuple[str, ...], rows: Iterable[Tuple],
+                                conflict_columns: Tuple[str, ...], update_columns: Tuple[str, ...],
+                                update_where: Optional[str] = None) -> None:
+        """
+        行をCOPYで {table}_stage に流し込み、1回の INSERT ... SELECT ... ON CONFLICT で table にマージ
+        
+        ステージングテーブルはセッション単位のTEMPテーブル（WALなし）で、コミット時に行が消える。
+        同一キーの行はexecute_valuesでの登録と同じく後勝ちで1行に絞ってから流し込む。
+        update_where を渡すと、競合した行はその条件を満たす場合のみ更新する。
+        """
+        stage = f"{table}_stage"
+        column_list = ', '.join(columns)
+        conflict_list = ', '.join(conflict_columns)
+        update_list = ',\n                '.join(f"{column} = EXCLUDED.{column}" for column in update_columns)
+        where_clause = f"WHERE {update_where}" if update_where else ''
+        
+        cursor.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {stage}
+            ON COMMIT DELETE ROWS
+            AS SELECT {column_list} FROM {table} WITH NO DATA
+        """)
+        cursor.execute(f"TRUNCATE {stage}")
+        
+        # 同一バッチ内でキーが重複するとON CONFLICTが同じ行を2回更新できずに失敗するため、後の行を残す
+        key_indexes = [columns.index(column) for column in conflict_columns]
+        unique_rows = {tuple(row[i] for i in key_indexes): row for row in rows}
+        
+        cursor.copy_expert(
+            f"COPY {stage} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+            _CsvRowStream(unique_rows.values())
+        )
+        
+        cursor.execute(f"""
+            INSERT INTO {table} ({column_list})
+            SELECT {column_list}
+            FROM {stage}
+            ON CONFLICT ({conflict_list}) DO UPDATE SET
+                {update_list}
+            {where_clause}
+        """)
+    
+    def _insert_race_payouts_with_cursor(self, cursor, payouts: List[RacePayout]) -> bool:
+        """カーソルを使った払い戻し挿入（トランザクション内用）"""
+        if not payouts:
+            return True
+        
         try:
-            insert_data = []
-            for result in results:
-                data = {
-                    'race_id': result.race_id,
-                    'horse_id': result.horse_id,
-                    'horse_name': result.horse_name,
-                    'bracket_number': result.bracket_number,
-                    'horse_number': result.horse_number,
-                    'age': result.age,
-                    'sex': result.sex,
-                    'jockey_weight': result.jockey_weight,
-                    'jockey_name': result.jockey_name,
-                    'trainer_name': result.trainer_name,
-                    'finish_position': result.finish_position,
-                    'jockey_id': result.jockey_id,
-                    'trainer_region': result.trainer_region,
-                    'trainer_id': result.trainer_id,
-                    'race_time': result.race_time,
-                    'time_diff': result.time_diff,
-                    'passing_order': result.passing_order,
-                    'last_3f': result.last_3f,
-                    'odds': result.odds,
-                    'popularity': result.popularity,
-                    'horse_weight': result.horse_weight,
-                    'weight_change': result.weight_change,
-                    'prize_money': result.prize_money,
-                    'owner_id': result.owner_id,
-                    'owner_name': result.owner_name,
-                    'created_at': result.created_at or datetime.now(),
-                    'updated_at': result.updated_at or datetime.now()
-                }
-                insert_data.append(data)
+            now = datetime.now()
+            # 1文の中で同じ行を2回更新できないため、同一キーは後勝ちで1行にまとめる
+            rows = {}
+            for payout in payouts:
+                fields = _get_race_payout_fields(payout)
+                rows[fields[:3]] = fields + (payout.created_at or now, payout.updated_at or now)
             
-            cursor.executemany("""
-                INSERT INTO race_results (
-                    race_id, horse_id, horse_name, bracket_number, horse_number,
-                    age, sex, jockey_weight, jockey_name, trainer_name,
-                    finish_position, jockey_id, trainer_region, trainer_id,
-                    race_time, time_diff, passing_order, last_3f, odds,
-                    popularity, horse_weight, weight_change, prize_money,
-                    owner_id, owner_name, created_at, updated_at
-                ) VALUES (
-                    %(race_id)s, %(horse_id)s, %(horse_name)s, %(bracket_number)s, %(horse_number)s,
-                    %(age)s, %(sex)s, %(jockey_weight)s, %(jockey_name)s, %(trainer_name)s,
-                    %(finish_position)s, %(jockey_id)s, %(trainer_region)s, %(trainer_id)s,
-                    %(race_time)s, %(time_diff)s, %(passing_order)s, %(last_3f)s, %(odds)s,
-                    %(popularity)s, %(horse_weight)s, %(weight_change)s, %(prize_money)s,
-                    %(owner_id)s, %(owner_name)s, %(created_at)s, %(updated_at)s
+            if len(rows) > _PAYOUT_COPY_THRESHOLD:
+                # 過去データの一括投入など件数が多い場合はCOPYで流し込む
+                self._copy_merge_with_cursor(
+                    cursor, 'race_payouts', _RACE_PAYOUT_COLUMNS, rows.values(),
+                    conflict_columns=('race_id', 'bet_type', 'combination'),
+                    update_columns=('payout_amount', 'popularity', 'updated_at')
                 )
-                ON CONFLICT (race_id, horse_id) DO UPDATE SET
-                    updated_at = EXCLUDED.updated_at,
-                    finish_position = EXCLUDED.finish_position,
-                    race_time = EXCLUDED.race_time,
-                    odds = EXCLUDED.odds,
-                    popularity = EXCLUDED.popularity,
-                    horse_weight = EXCLUDED.horse_weight,
-                    weight_change = EXCLUDED.weight_change
-            """, insert_data)
+                return True
+            
+            execute_values(cursor, _RACE_PAYOUT_UPSERT_SQL, list(rows.values()), page_size=1000)
             return True
         except Exception as e:
-            logger.error(f"Error inserting race results with cursor: {e}")
+            logger.error(f"Error inserting race payouts with cursor: {e}")
             return False
     
-    def get_database_stats(self) -> Dict[str, Any]:
-        """データベース統計情報を取得"""
+    def get_database_stats(self, estimate: bool = False) -> Dict[str, Any]:
+        """
+        データベース統計情報を取得（1クエリ）
+        
+        Args:
+            estimate: Trueの場合、races以外の件数はpg_classの推定値を使う（全件スキャンしない）
+        """
+        if estimate:
+            count_sql = "(SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = '{}'::regclass)"
+        else:
+            count_sql = "(SELECT COUNT(*) FROM {})"
+        
         try:
             with self.get_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                    stats = {}
-                    
-                    # 各テーブルの件数
-                    tables = ['races', 'race_results', 'horses', 'horse_relations']
-                    for table in tables:
-                        cursor.execute(f"SELECT COUNT(*) as count FROM {table}")
-                        result = cursor.fetchone()
-                        stats[f'{table}_count'] = result['count'] if result else 0
-                    
-                    # 最新レース日
-                    cursor.execute("SELECT MAX(race_date) as latest_race_date FROM races")
-                    result = cursor.fetchone()
-                    stats['latest_race_date'] = result['latest_race_date'] if result['latest_race_date'] else None
-                    
-                    # G1レース数
-                    cursor.execute("SELECT COUNT(*) as g1_count FROM races WHERE grade = 'G1'")
-                    result = cursor.fetchone()
-                    stats['g1_races_count'] = result['g1_count'] if result else 0
-                    
-                    return stats
+                    # racesは件数・最新レース日・G1レース数を1回のスキャンで集計
+                    cursor.execute(f"""
+                        SELECT
+                            r.races_count,
+                            {count_sql.format('race_results')} AS race_results_count,
+                            {count_sql.format('horses')} AS horses_count,
+                            {count_sql.format('horse_relations')} AS horse_relations_count,
+                            r.latest_race_date,
+                            r.g1_races_count
+                        FROM (
+                            SELECT
+                                COUNT(*) AS races_count,
+                                MAX(race_date) AS latest_race_date,
+                                COUNT(*) FILTER (WHERE grade = 'G1') AS g1_races_count
+                            FROM races
+                        ) AS r
+                    """)
+                    return dict(cursor.fetchone())
         except Exception as e:
             logger.error(f"Error getting database stats: {e}")
             return {}
@@ -1036,14 +1667,45 @@ class PostgreSQLStorage:
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    # レース結果を先に削除（外部キー制約）
-                    cursor.execute("DELETE FROM race_results WHERE race_id = %s", (race_id,))
-                    # レース基本情報を削除
-                    cursor.execute("DELETE FROM races WHERE race_id = %s", (race_id,))
-                    
-                    conn.commit()
-                    logger.info(f"Race data deleted: {race_id}")
-                    return True
+                    # レース結果とレース基本情報を1文で削除（外部キーの検査は文の終了時なので結果の削除が先に効く）
+                    cursor.execute("""
+                        WITH deleted_results AS (
+                            DELETE FROM race_results WHERE race_id = %(race_id)s
+                        )
+                        DELETE FROM races WHERE race_id = %(race_id)s
+                    """, {'race_id': race_id})
+            
+            self._known_race_ids.discard(race_id)
+            logger.info(f"Race data deleted: {race_id}")
+            return True
         except Exception as e:
             logger.error(f"Error deleting race data {race_id}: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def delete_race_data_bulk(self, race_ids: List[str]) -> int:
+        """
+        複数レースのデータを1文で削除（テスト用）
+        
+        Returns:
+            int: 削除したレース数（失敗時は-1）
+        """
+        if not race_ids:
+            return 0
+        
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                        WITH deleted_results AS (
+                            DELETE FROM race_results WHERE race_id = ANY(%(race_ids)s)
+                        )
+                        DELETE FROM races WHERE race_id = ANY(%(race_ids)s)
+                    """, {'race_ids': list(race_ids)})
+                    deleted = cursor.rowcount
+            
+            self._known_race_ids.difference_update(race_ids)
+            logger.info(f"Race data deleted: {deleted} races")
+            return deleted
+        except Exception as e:
+            logger.error(f"Error deleting race data ({len(race_ids)} races): {e}")
+            return -1
\ No newline at end of file
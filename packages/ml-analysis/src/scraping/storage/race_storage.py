@@ -4,27 +4,89 @@ src/scraping/storage/race_storage.py
 """
 
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 from datetime import datetime
 
 from ..storage.supabase_storage import SupabaseStorage
-from ...database.schemas.race_schema import Race, RaceResult
+from ...database.schemas.race_schema import Race, RaceResult, RacePayout
 
 logger = logging.getLogger(__name__)
 
+# PostgRESTが「RPCの関数が見つからない」ときに返すエラーコード
+FUNCTION_NOT_FOUND = 'PGRST202'
+
+# get_statistics / get_race_summary の結果をプロセス内で使い回す秒数
+READ_CACHE_TTL = 300
+
+# PostgRESTで1リクエストにまとめるレース結果の件数（環境変数 RACE_RESULTS_BATCH で変更可）
+RACE_RESULTS_BATCH_SIZE = int(os.getenv('RACE_RESULTS_BATCH', '1000'))
+
+# この件数を超えるレース結果は、SupabaseのPostgreSQLに直接つなげる場合はCOPYで投入する
+COPY_THRESHOLD = 500
+
+# SupabaseのPostgreSQLへの接続文字列を指定する環境変数
+# （POSTGRES_* はローカルDB用なので使わない。未設定ならPostgREST経由のみ）
+SUPABASE_DB_URL_ENV = 'SUPABASE_DB_URL'
+
+# in_() フィルタに一度に渡すID数（PostgRESTのURL長の上限を超えないように分割）
+IN_FILTER_CHUNK_SIZE = 500
+
 class RaceStorage(SupabaseStorage):
     """レースデータのSupabaseストレージクラス"""
     
     def __init__(self):
         super().__init__()
+        # 存在が確認済みのレースID（存在する結果のみ保持するので無効化は不要）
+        self._existing_race_ids: Set[str] = set()
+        # get_race_stats() / upsert_complete_race(s)_supabase() が未作成と分かったら以後はRPCを呼ばない
+        self._has_stats_function = True
+        self._has_upsert_function = True
+        self._has_batch_upsert_function = True
+        # 大量投入用のPostgreSQL直結ストレージ（初回に作成、使えない場合はFalse）
+        self._pg_storage = None
+        # 集計系の読み取り結果（キー -> (取得時刻, 結果)）、書き込み時に破棄する
+        self._read_cache: Dict[Tuple, Tuple[float, Any]] = {}
+    
+    def _cached_read(self, key: Tuple, fetch: Callable[[], Any]) -> Any:
+        """READ_CACHE_TTL秒以内の結果があれば再利用し、なければ取得してキャッシュ（空の結果はキャッシュしない）"""
+        cached = self._read_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < READ_CACHE_TTL:
+            return cached[1]
+        
+        value = fetch()
+        if value:
+            self._read_cache[key] = (now, value)
+        return value
+    
+    def _get_pg_storage(self):
+        """SupabaseのDBに直結するCOPY用のPostgreSQLStorageを返す（psycopg2未導入・SUPABASE_DB_URL未設定の場合はNone）"""
+        if self._pg_storage is None:
+            self._pg_storage = False
+            dsn = os.getenv(SUPABASE_DB_URL_ENV)
+            if dsn:
+                try:
+                    from .postgresql_storage import PostgreSQLStorage
+                    self._pg_storage = PostgreSQLStorage(dsn=dsn)
+                except ImportError as e:
+                    logger.warning(f"PostgreSQL bulk path unavailable: {e}")
+        return self._pg_storage or None
+    
+    def invalidate_stats(self):
+        """get_statistics / get_race_summary のキャッシュを破棄"""
+        self._read_cache.clear()
     
     def insert_race(self, race: Race) -> bool:
         """単一レースデータの挿入"""
         try:
             data = race.to_dict()
-            result = self.client.table('races').insert(data).execute()
+            result = self._execute_write(self.client.table('races').upsert(data, on_conflict='race_id'))
             
             if result.data:
+                self._existing_race_ids.add(race.race_id)
+                self.invalidate_stats()
                 logger.info(f"Race inserted successfully: {race.race_id}")
                 return True
             else:
@@ -43,18 +105,28 @@ class RaceStorage(SupabaseStorage):
         """
         if not results:
             return 0, 0
+        
+        # 件数が多い場合はPostgRESTを経由せず、PostgreSQLに直接COPYで流し込む
+        if len(results) > COPY_THRESHOLD:
+            pg_storage = self._get_pg_storage()
+            if pg_storage is not None and pg_storage.copy_race_results_overwrite(results):
+                self.invalidate_stats()
+                logger.info(f"Race results copied: {len(results)} results")
+                return len(results), 0
             
         success_count = 0
         error_count = 0
         
         # バッチサイズごとに分割して挿入
-        batch_size = 50
+        batch_size = RACE_RESULTS_BATCH_SIZE
         for i in range(0, len(results), batch_size):
             batch = results[i:i + batch_size]
             
             try:
                 data_batch = [result.to_dict() for result in batch]
-                result = self.client.table('race_results').insert(data_batch).execute()
+                result = self._execute_write(
+                    self.client.table('race_results').upsert(data_batch, on_conflict='race_id,horse_id')
+                )
                 
                 if result.data:
                     success_count += len(batch)
@@ -68,11 +140,31 @@ class RaceStorage(SupabaseStorage):
                 race_id = batch[0].race_id if batch else "unknown"
                 logger.error(f"Error inserting batch for race {race_id}: {str(e)}")
         
+        if success_count:
+            self.invalidate_stats()
         logger.info(f"Race results insertion complete: {success_count} success, {error_count} failed")
         return success_count, error_count
     
     def insert_complete_race_data(self, race: Race, results: List[RaceResult]) -> bool:
-        """レース基本情報と結果を一括挿入（トランザクション風）"""
+        """レース基本情報と結果を一括挿入（upsert_complete_race_supabase() があれば1回のRPCで1トランザクション）"""
+        if self._has_upsert_function:
+            try:
+                now = datetime.now().isoformat()
+                race_row = {**race.to_dict(), 'created_at': now, 'updated_at': now}
+                result_rows = [{**result.to_dict(), 'created_at': now, 'updated_at': now} for result in results]
+                self._execute_write(self.client.rpc('upsert_complete_race_supabase', {'race': race_row, 'results': result_rows}))
+                
+                self._existing_race_ids.add(race.race_id)
+                self.invalidate_stats()
+                logger.info(f"Race data inserted via upsert_complete_race_supabase(): {race.race_id}")
+                return True
+            except Exception as e:
+                if getattr(e, 'code', None) != FUNCTION_NOT_FOUND:
+                    logger.error(f"Error in complete race data insertion: {str(e)}")
+                    return False
+                self._has_upsert_function = False
+                logger.warning("upsert_complete_race_supabase() is not defined; apply sql/migrations/007_upsert_complete_race_supabase.sql")
+        
         try:
             # 1. レース基本情報を挿入
             race_success = self.insert_race(race)
@@ -101,19 +193,135 @@ class RaceStorage(SupabaseStorage):
             logger.error(f"Error in complete race data insertion: {str(e)}")
             return False
     
+    def insert_complete_race_data_batch(self, items: List[Tuple[Race, List[RaceResult], List[RacePayout]]]) -> bool:
+        """
+        複数レースの基本情報・結果・払い戻しをまとめて挿入
+        
+        upsert_complete_races_supabase() があれば1回のRPCで1トランザクションにまとめる。
+        未作成の場合はテーブルごとに別のリクエストで書き込むため、1トランザクションにはならない。
+        その場合、途中で失敗しても登録済みのレースは残るが、結果・払い戻しまで登録できるまでは存在確認済みとして扱わない。
+        """
+        if not items:
+            return True
+        
+        if self._has_batch_upsert_function:
+            try:
+                now = datetime.now().isoformat()
+                timestamps = {'created_at': now, 'updated_at': now}
+                self._execute_write(self.client.rpc('upsert_complete_races_supabase', {
+                    'races': [{**race.to_dict(), **timestamps} for race, _, _ in items],
+                    'results': [{**r.to_dict(), **timestamps} for _, results, _ in items for r in results],
+                    'payouts': [{**p.to_dict(), **timestamps} for _, _, payouts in items for p in payouts]
+                }))
+                
+                self._existing_race_ids.update(race.race_id for race, _, _ in items)
+                self.invalidate_stats()
+                logger.info(f"Race data batch inserted via upsert_complete_races_supabase(): {len(items)} races")
+                return True
+            except Exception as e:
+                if getattr(e, 'code', None) != FUNCTION_NOT_FOUND:
+                    logger.error(f"Error in race data batch insertion: {str(e)}")
+                    return False
+                self._has_batch_upsert_function = False
+                logger.warning("upsert_complete_races_supabase() is not defined; apply sql/migrations/008_upsert_complete_races_supabase.sql")
+        
+        try:
+            # 1. レース基本情報を一括挿入
+            races_data = [race.to_dict() for race, _, _ in items]
+            result = self._execute_write(self.client.table('races').upsert(races_data, on_conflict='race_id'))
+            if not result.data:
+                logger.error(f"Failed to insert race batch: {len(items)} races")
+                return False
+            self.invalidate_stats()
+            
+            # 2. レース結果を一括挿入
+            all_results = [r for _, results, _ in items for r in results]
+            success_count, error_count = self.insert_race_results(all_results)
+            
+            if error_count > 0:
+                logger.warning(f"Some race results failed to insert: {error_count} errors")
+            
+            # 3. 払い戻し情報を一括挿入
+            payouts_success = self._insert_payouts_data(
+                [p.to_dict() for _, _, payouts in items for p in payouts]
+            )
+            
+            # 結果の成功率が80%以上で、払い戻しがすべて登録できていれば成功とみなす
+            total_results = len(all_results)
+            success_rate = success_count / total_results if total_results > 0 else 1.0
+            
+            if not payouts_success:
+                logger.error(f"Failed to insert race payouts batch: {len(items)} races")
+                return False
+            if success_rate >= 0.8:
+                self._existing_race_ids.update(race.race_id for race, _, _ in items)
+                logger.info(f"Race data batch insertion completed successfully: {len(items)} races")
+                return True
+            else:
+                logger.error(f"Too many failures in race results batch insertion: {len(items)} races")
+                return False
+                
+        except Exception as e:
+            logger.error(f"Error in race data batch insertion: {str(e)}")
+            return False
+    
+    def _insert_payouts_data(self, payouts_data: List[Dict[str, Any]]) -> bool:
+        """払い戻し情報の行をまとめてupsert（行がなければ何もせず成功）"""
+        if not payouts_data:
+            return True
+        
+        try:
+            result = self._execute_write(
+                self.client.table('race_payouts').upsert(payouts_data, on_conflict='race_id,bet_type,combination')
+            )
+            return bool(result.data)
+        except Exception as e:
+            logger.error(f"Error inserting race payouts: {str(e)}")
+            return False
+    
     def check_race_exists(self, race_id: str) -> bool:
         """レースが既に存在するかチェック"""
+        if race_id in self._existing_race_ids:
+            return True
+        
         try:
             result = self.client.table('races').select('race_id').eq('race_id', race_id).execute()
-            return len(result.data) > 0
+            if result.data:
+                self._existing_race_ids.add(race_id)
+                return True
+            return False
         except Exception as e:
             logger.error(f"Error checking race existence {race_id}: {str(e)}")
             return False
     
-    def get_races_by_date_range(self, start_date: str, end_date: str, grade: Optional[str] = None) -> List[Dict[str, Any]]:
-        """日付範囲でレースを取得"""
+    def get_existing_race_ids(self, race_ids: List[str]) -> Set[str]:
+        """指定したレースIDのうち既に存在するものをまとめて取得（IN_FILTER_CHUNK_SIZE件ごとに1クエリ）"""
+        if not race_ids:
+            return set()
+        
+        # キャッシュ済みのIDは問い合わせない
+        existing = {race_id for race_id in race_ids if race_id in self._existing_race_ids}
+        unknown = [race_id for race_id in race_ids if race_id not in existing]
+        if not unknown:
+            return existing
+        
         try:
-            query = self.client.table('races').select('*').gte('race_date', start_date).lte('race_date', end_date)
+            found: Set[str] = set()
+            for i in range(0, len(unknown), IN_FILTER_CHUNK_SIZE):
+                chunk = unknown[i:i + IN_FILTER_CHUNK_SIZE]
+                result = self.client.table('races').select('race_id').in_('race_id', chunk).execute()
+                found.update(row['race_id'] for row in result.data)
+            self._existing_race_ids.update(found)
+            return existing | found
+        except Exception as e:
+            logger.error(f"Error fetching existing race ids: {str(e)}")
+            return set()
+    
+    def get_races_by_date_range(self, start_date: str, end_date: str, grade: Optional[str] = None,
+                                columns: str = '*') -> List[Dict[str, Any]]:
+        """日付範囲でレースを取得（columnsで取得する列を絞れる、例: 'race_id,race_date,race_name,grade'）"""
+        try:
+            query = self.client.table('races').select(columns).gte('race_date', start_date).lte('race_date', end_date)
             
             if grade:
                 query = query.eq('grade', grade)
@@ -125,16 +333,20 @@ class RaceStorage(SupabaseStorage):
             logger.error(f"Error fetching races by date range: {str(e)}")
             return []
     
-    def get_race_results(self, race_id: str) -> List[Dict[str, Any]]:
-        """特定レースの結果を取得"""
+    def get_race_results(self, race_id: str, columns: str = '*') -> List[Dict[str, Any]]:
+        """特定レースの結果を取得（columnsで取得する列を絞れる、例: 'horse_id,horse_name,finish_position'）"""
         try:
-            result = self.client.table('race_results').select('*').eq('race_id', race_id).order('finish_position').execute()
+            result = self.client.table('race_results').select(columns).eq('race_id', race_id).order('finish_position').execute()
             return result.data
         except Exception as e:
             logger.error(f"Error fetching race results for {race_id}: {str(e)}")
             return []
     
     def get_race_summary(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """レースサマリービューからデータを取得（READ_CACHE_TTL秒キャッシュ）"""
+        return self._cached_read(('race_summary', limit), lambda: self._fetch_race_summary(limit))
+    
+    def _fetch_race_summary(self, limit: int) -> List[Dict[str, Any]]:
         """レースサマリービューからデータを取得"""
         try:
             result = self.client.table('race_summary').select('*').limit(limit).execute()
@@ -146,18 +358,75 @@ class RaceStorage(SupabaseStorage):
     def get_horse_race_history(self, horse_id: str) -> List[Dict[str, Any]]:
         """特定の馬のレース履歴を取得"""
         try:
-            result = self.client.table('race_results')\
-                .select('*, races!inner(*)')\
-                .eq('horse_id', horse_id)\
-                .order('races.race_date', desc=True)\
-                .execute()
-            return result.data
+            # 結果ごとにレース情報を埋め込むと同じレースを何度も送ることになるため、結果とレースを別々に取得して結合
+            results = self.client.table('race_results').select('*').eq('horse_id', horse_id).execute().data
+            history = self._attach_races(results)
+            history.sort(key=lambda row: (row['races']['race_date'], row['race_id']), reverse=True)
+            return history
         except Exception as e:
             logger.error(f"Error fetching horse race history for {horse_id}: {str(e)}")
             return []
     
+    def iter_horse_race_history(self, horse_id: str, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        特定の馬のレース履歴をpage_size件ずつ取得しながら返す（途中で打ち切れば残りは取得しない）
+        
+        順序は get_horse_race_history と同じく開催日の降順（同日はレースIDの降順で、ページ間の順序を固定する）。
+        取得に失敗した場合は例外を送出する。
+        """
+        offset = 0
+        while True:
+            # 並べ替え用に開催日だけを埋め込み、レース情報全体は _attach_races でまとめて取得する
+            page = self.client.table('race_results').select('*, races!inner(race_date)')\
+                .eq('horse_id', horse_id)\
+                .order('races(race_date)', desc=True)\
+                .order('race_id', desc=True)\
+                .range(offset, offset + page_size - 1)\
+                .execute().data
+            yield from self._attach_races(page)
+            if len(page) < page_size:
+                return
+            offset += page_size
+    
+    def _attach_races(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """結果の各行にレース情報を 'races' として付ける（races!inner と同じく、レース情報がない結果は除く）"""
+        race_ids = list({row['race_id'] for row in results})
+        
+        races: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(race_ids), IN_FILTER_CHUNK_SIZE):
+            chunk = race_ids[i:i + IN_FILTER_CHUNK_SIZE]
+            for race in self.client.table('races').select('*').in_('race_id', chunk).execute().data:
+                races[race['race_id']] = race
+        
+        attached = []
+        for row in results:
+            race = races.get(row['race_id'])
+            if race is not None:
+                row['races'] = race
+                attached.append(row)
+        return attached
+    
     def get_statistics(self) -> Dict[str, Any]:
-        """データベースの統計情報を取得"""
+        """データベースの統計情報を取得（READ_CACHE_TTL秒キャッシュ）"""
+        return self._cached_read(('statistics',), self._fetch_statistics)
+    
+    def _fetch_statistics(self) -> Dict[str, Any]:
+        """データベースの統計情報を取得（get_race_stats() でサーバー側集計、未作成なら各テーブルから取得）"""
+        if self._has_stats_function:
+            try:
+                result = self.client.rpc('get_race_stats').execute()
+                stats = result.data or {}
+                if stats.get('latest_race_date') is None:
+                    stats.pop('latest_race_date', None)
+                return stats
+            except Exception as e:
+                if getattr(e, 'code', None) == FUNCTION_NOT_FOUND:
+                    self._has_stats_function = False
+                    logger.warning("get_race_stats() is not defined; apply sql/migrations/004_get_race_stats.sql")
+                else:
+                    # 一時的なエラーの可能性があるので、今回だけテーブルごとの取得で代替する
+                    logger.error(f"Error calling get_race_stats(): {str(e)}")
+        
         try:
             stats = {}
             
@@ -194,6 +463,9 @@ class RaceStorage(SupabaseStorage):
             # CASCADE設定により、race_resultsも自動削除される
             result = self.client.table('races').delete().eq('race_id', race_id).execute()
             
+            self._existing_race_ids.discard(race_id)
+            self.invalidate_stats()
+            
             if result.data:
                 logger.info(f"Race and its results deleted: {race_id}")
                 return True
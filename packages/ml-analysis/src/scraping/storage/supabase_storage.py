@@ -1,12 +1,67 @@
 # src/scraping/storage/supabase_storage.py
 
+import logging
 import os
-from typing import Dict, List
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
 from dotenv import load_dotenv
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
 
+try:
+    from ..utils.constants import DIRECT_HORSE_COLUMNS
+except ImportError:
+    from utils.constants import DIRECT_HORSE_COLUMNS
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# 1回のupsertで送る最大行数（PostgRESTのリクエストサイズを抑える）
+UPSERT_BATCH_SIZE = 500
+
+# 書き込みの最大試行回数（一時的なエラーのみ再試行）
+WRITE_ATTEMPTS = 4
+
+# 再試行するPostgreSQLのエラークラス（SQLSTATEの先頭2文字: 接続・ロールバック・リソース不足・運用介入・システムエラー）
+_TRANSIENT_SQLSTATE_CLASSES = frozenset({'08', '40', '53', '57', '58'})
+
+# 再試行するPostgRESTのエラーコード（データベースへの接続失敗など）
+_TRANSIENT_PGRST_CODES = frozenset({'PGRST000', 'PGRST001', 'PGRST002', 'PGRST003'})
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """再試行すれば成功しうるエラーか（通信エラー・5xx・一時的なDBエラー）"""
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, APIError):
+        code = error.code
+        # JSONでないエラーレスポンス（ゲートウェイの502 HTMLなど）はHTTPステータスが入る
+        if isinstance(code, int):
+            return code >= 500
+        if code:
+            return code in _TRANSIENT_PGRST_CODES or code[:2] in _TRANSIENT_SQLSTATE_CLASSES
+    return False
+
+
+# プロセス内で共有するクライアント（(URL, キー) -> Client）
+_clients: Dict[Tuple[str, str], Client] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(supabase_url: str, supabase_key: str) -> Client:
+    """同じ接続先のクライアントを使い回す（インスタンスごとにHTTP接続を作らない）"""
+    key = (supabase_url, supabase_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = create_client(supabase_url, supabase_key)
+        return client
+
+
 class SupabaseStorage:
     """Supabaseへのデータ保存を管理するクラス"""
     
@@ -15,91 +70,113 @@ class SupabaseStorage:
         supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
         
         if supabase_url and supabase_key:
-            self.supabase: Client = create_client(supabase_url, supabase_key)
+            self.supabase: Optional[Client] = _get_client(supabase_url, supabase_key)
         else:
-            print("⚠️ Supabase環境変数が設定されていません")
+            logger.warning("Supabase環境変数が設定されていません")
             self.supabase = None
+        
+        # RaceStorage は self.client で参照する
+        self.client = self.supabase
+    
+    def _execute_write(self, query, attempts: int = WRITE_ATTEMPTS) -> Any:
+        """
+        書き込みクエリを実行（一時的なエラーは指数バックオフ＋ジッターで再試行）
+        
+        再試行しても重複しないよう、upsertなど冪等な書き込みにだけ使う。
+        """
+        for attempt in range(attempts):
+            try:
+                return query.execute()
+            except Exception as e:
+                if attempt == attempts - 1 or not _is_transient_error(e):
+                    raise
+                delay = min(0.2 * (2 ** attempt), 5.0) + random.uniform(0, 0.1)
+                logger.warning(f"Transient Supabase error, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
     
     def save_horse_data(self, horse_data: Dict) -> bool:
         """馬の基本情報をSupabaseに保存"""
-        if not self.supabase:
+        return self.save_horses_batch([horse_data])
+    
+    def save_horses_batch(self, horses: List[Dict]) -> bool:
+        """
+        複数の馬の基本情報をまとめてSupabaseに保存
+        
+        項目の揃った馬ごとに最大UPSERT_BATCH_SIZE件ずつ1回のupsertで送る
+        （一括upsertでは送らなかった列がNULLで上書きされるため、列の組み合わせが違う行は分ける）。
+        """
+        if not self.supabase or not horses:
             return False
         
         try:
-            # 直接カラム用のデータを分離
-            direct_columns = {
-                'id': horse_data['id'],
-                'name_ja': horse_data.get('name_ja'),
-                'name_en': horse_data.get('name_en'),
-                'birth_date': horse_data.get('birth_date'),
-                'sex': horse_data.get('sex'),
-                'sire_id': horse_data.get('sire_id'),
-                'dam_id': horse_data.get('dam_id'),
-                'maternal_grandsire_id': horse_data.get('maternal_grandsire_id')
-            }
+            # 同じIDは後勝ちで1行にまとめる（1文で同じ行を2回更新できないため）
+            rows = {horse_data['id']: self._build_horse_row(horse_data) for horse_data in horses}
             
-            # profile用のデータ（直接カラム以外）
-            profile_data = {
-                key: value for key, value in horse_data.items() 
-                if key not in ['id', 'name_ja', 'name_en', 'birth_date', 'sex', 'sire_id', 'dam_id', 'maternal_grandsire_id']
-            }
+            groups: Dict[frozenset, List[Dict]] = {}
+            for row in rows.values():
+                groups.setdefault(frozenset(row), []).append(row)
             
-            # 最終的な保存データ
-            save_data = {**direct_columns, 'profile': profile_data}
-            
-            # None値を除去
-            save_data = {k: v for k, v in save_data.items() if v is not None}
-            
-            # upsertで保存
-            result = self.supabase.table('horses').upsert(
-                save_data, on_conflict='id'
-            ).execute()
-            
-            print(f"    💾 保存データ構造:")
-            print(f"      直接カラム: {list(direct_columns.keys())}")
-            print(f"      プロフィール項目: {list(profile_data.keys())}")
+            for group in groups.values():
+                for i in range(0, len(group), UPSERT_BATCH_SIZE):
+                    self._execute_write(self.supabase.table('horses').upsert(
+                        group[i:i + UPSERT_BATCH_SIZE], on_conflict='id'
+                    ))
             
+            logger.debug("Horses saved: %d (%d upsert groups)", len(rows), len(groups))
             return True
             
         except Exception as e:
-            print(f"    ❌ 馬データ保存エラー: {e}")
+            logger.error(f"馬データ保存エラー: {e}")
             return False
     
+    def _build_horse_row(self, horse_data: Dict) -> Dict:
+        """horsesテーブルに保存する1行（直接カラム以外はprofileにまとめ、直接カラムのNone値は送らない）"""
+        # 1回の走査で直接カラムとprofile用のデータに振り分ける
+        row = {}
+        profile_data = {}
+        for key, value in horse_data.items():
+            if key in DIRECT_HORSE_COLUMNS:
+                if value is not None:
+                    row[key] = value
+            else:
+                profile_data[key] = value
+        row['profile'] = profile_data
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Horse %s: columns=%s profile=%s", horse_data['id'], list(row), list(profile_data))
+        
+        return row
+    
     def save_relations(self, relations: List[Dict]) -> bool:
         """血統関係をSupabaseに保存"""
         if not self.supabase or not relations:
             return False
         
         try:
-            saved_count = 0
+            clean_relations = [
+                {
+                    'horse_a_id': relation['horse_a_id'],
+                    'horse_b_id': relation['horse_b_id'],
+                    'relation_type': relation['relation_type'],
+                    'children_ids': relation.get('children_ids')
+                }
+                for relation in relations
+            ]
             
-            for relation in relations:
-                # 重複チェック
-                existing = self.supabase.table('horse_relations').select('id').eq(
-                    'horse_a_id', relation['horse_a_id']
-                ).eq('horse_b_id', relation['horse_b_id']).eq(
-                    'relation_type', relation['relation_type']
-                ).execute()
-                
-                if not existing.data:
-                    clean_relation = {
-                        'horse_a_id': relation['horse_a_id'],
-                        'horse_b_id': relation['horse_b_id'],
-                        'relation_type': relation['relation_type'],
-                        'children_ids': relation.get('children_ids')
-                    }
-                    
-                    self.supabase.table('horse_relations').insert(clean_relation).execute()
-                    saved_count += 1
-                    print(f"      💾 関係保存: {relation['relation_type']} ({relation['horse_a_id']} -> {relation['horse_b_id']})")
-                else:
-                    print(f"      💡 関係既存: {relation['relation_type']}")
+            # 重複チェックのSELECTはせず、1回のupsertで既存の関係を無視して登録
+            # （sql/migrations/001_horse_relations_unique.sql のユニークインデックスが前提）
+            result = self._execute_write(self.supabase.table('horse_relations').upsert(
+                clean_relations,
+                on_conflict='horse_a_id,horse_b_id,relation_type',
+                ignore_duplicates=True
+            ))
             
-            print(f"    ✅ {saved_count}件の関係を保存")
+            saved_count = len(result.data or [])
+            logger.info("%d件の関係を保存（既存 %d件）", saved_count, len(clean_relations) - saved_count)
             return True
             
         except Exception as e:
-            print(f"    ❌ 関係保存エラー: {e}")
+            logger.error(f"関係保存エラー: {e}")
             return False
     
     def save_all(self, horse_data: Dict, relations: List[Dict]) -> bool:
@@ -0,0 +1,111 @@
+"""
+aiohttpによる非同期HTTP取得ユーティリティ
+src/scraping/utils/async_http.py
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from .http_session import RETRY_STATUSES
+from .rate_limiter import RateLimiter
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp未導入環境では各スクレイパーが同期処理にフォールバック
+    aiohttp = None
+
+try:
+    import aiodns  # noqa: F401  AsyncResolverの利用可否判定のみに使用
+    HAS_AIODNS = True
+except ImportError:
+    HAS_AIODNS = False
+
+logger = logging.getLogger(__name__)
+
+HAS_AIOHTTP = aiohttp is not None
+
+
+def can_run_async() -> bool:
+    """
+    同期メソッドの中でasyncio.run()による非同期取得に切り替えてよいか
+
+    aiohttpが未導入の場合と、イベントループが既に動いている場合（Jupyterなど）はFalse。
+    """
+    if not HAS_AIOHTTP:
+        return False
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return True
+    return False
+
+
+def create_async_session(headers: Optional[Dict[str, str]] = None,
+                         limit_per_host: int = 8,
+                         dns_cache_ttl: int = 300,
+                         timeout: float = 15) -> 'aiohttp.ClientSession':
+    """
+    接続プール付きのaiohttpセッションを作成
+
+    DNSの解決結果はコネクタ側でキャッシュし、aiodnsがあればAsyncResolverで非同期に解決する。
+
+    Args:
+        headers: 全リクエスト共通のヘッダー
+        limit_per_host: 同一ホストへの同時接続数
+        dns_cache_ttl: DNSキャッシュの有効期間（秒）
+        timeout: リクエスト全体のタイムアウト（秒）
+    """
+    connector = aiohttp.TCPConnector(
+        limit_per_host=limit_per_host,
+        use_dns_cache=True,
+        ttl_dns_cache=dns_cache_ttl,
+        resolver=aiohttp.AsyncResolver() if HAS_AIODNS else None
+    )
+    return aiohttp.ClientSession(
+        headers=headers,
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout)
+    )
+
+
+async def afetch(session: 'aiohttp.ClientSession',
+                 semaphore: asyncio.Semaphore,
+                 url: str,
+                 params: Optional[Dict[str, Any]] = None,
+                 retries: int = 3,
+                 backoff_factor: float = 0.7,
+                 limiter: Optional[RateLimiter] = None) -> Optional[bytes]:
+    """
+    URLを非同期に取得してレスポンス本文（未デコードのbytes）を返す
+
+    429/5xxと通信エラーは指数バックオフでリトライする。待機中はセマフォを解放する。
+    limiterを渡した場合は、レスポンスヘッダーで指定された待機時間を同じlimiterを使う全リクエストに反映する。
+
+    Returns:
+        レスポンス本文（取得できなかった場合はNone）
+    """
+    for attempt in range(retries + 1):
+        try:
+            if limiter is not None:
+                await limiter.acquire()
+            async with semaphore:
+                async with session.get(url, params=params) as response:
+                    if limiter is not None:
+                        limiter.update(response.headers)
+                    response.raise_for_status()
+                    return await response.read()
+
+        except aiohttp.ClientResponseError as e:
+            if e.status not in RETRY_STATUSES or attempt == retries:
+                logger.error("Fetch failed: %s (status %s)", url, e.status)
+                return None
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == retries:
+                logger.error("Fetch failed: %s (%s)", url, e)
+                return None
+
+        await asyncio.sleep(backoff_factor * (2 ** attempt))
+
+    return None
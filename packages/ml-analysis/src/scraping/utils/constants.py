@@ -1,7 +1,9 @@
 # src/scraping/utils/constants.py
 
+from types import MappingProxyType
+
 # 日本語→英語フィールドマッピング
-HORSE_FIELD_MAPPING = {
+HORSE_FIELD_MAPPING = MappingProxyType({
     # 基本情報
     '馬名': 'name_ja',
     '英字名': 'name_en', 
@@ -35,22 +37,28 @@ HORSE_FIELD_MAPPING = {
     # その他
     'セリ取引価格': 'auction_price',
     '近親馬': 'related_horses'
-}
+})
 
 # 血統関係タイプ
-RELATION_TYPES = {
+RELATION_TYPES = MappingProxyType({
     'sire_of': '父子関係',
     'dam_of': '母子関係', 
     'mating': '種付関係',
     'bms_of': 'BMS関係'
-}
+})
 
 # 性別マッピング
-SEX_MAPPING = {
+SEX_MAPPING = MappingProxyType({
     '牡': 'stallion',
     '牝': 'mare',
     'せん': 'gelding'
-}
+})
+
+# レースグレード（判定はこの順で行う）
+RACE_GRADES = ('G1', 'G2', 'G3', 'OP', 'L')
 
-# レースグレード
-RACE_GRADES = ['G1', 'G2', 'G3', 'OP', 'L']
\ No newline at end of file
+# horsesテーブルの直接カラム（それ以外の項目はprofileにまとめる）
+DIRECT_HORSE_COLUMNS = frozenset({
+    'id', 'name_ja', 'name_en', 'birth_date', 'sex',
+    'sire_id', 'dam_id', 'maternal_grandsire_id'
+})
@@ -0,0 +1,38 @@
+"""
+リトライ付きrequestsセッションの作成
+src/scraping/utils/http_session.py
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 全スクレイパー共通のUser-Agent
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# リトライ対象のHTTPステータス（同期・非同期共通）
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def create_session(pool_maxsize: int = 16) -> requests.Session:
+    """
+    keep-aliveで接続を再利用するrequestsセッションを作成
+
+    一時的なエラー（429/5xx・接続リセット）はアダプタ層でバックオフ付きリトライする。
+
+    Args:
+        pool_maxsize: ホストごとに保持する接続数
+    """
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+
+    retry = Retry(
+        total=3,
+        backoff_factor=0.7,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET'])
+    )
+    adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,92 @@
+"""
+リクエスト間隔の制御
+src/scraping/utils/rate_limiter.py
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+
+class RateLimiter:
+    """
+    複数スレッド・タスクで共有するリクエスト開始間隔の制御
+
+    固定の最小間隔（最大rate_per_sec件/秒）に加えて、レスポンスヘッダー
+    （Retry-After / X-RateLimit-Remaining・X-RateLimit-Reset）で指定された待機時間を反映する。
+    """
+
+    def __init__(self, rate_per_sec: Optional[float] = None, max_wait: float = 300.0):
+        """
+        Args:
+            rate_per_sec: 1秒あたりの最大開始数（Noneまたは0以下で固定間隔なし）
+            max_wait: ヘッダー由来の待機時間の上限（秒）
+        """
+        self.interval = 1.0 / rate_per_sec if rate_per_sec and rate_per_sec > 0 else 0.0
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._next_time = time.monotonic()
+
+    def _reserve(self) -> float:
+        """次の開始枠を確保し、それまでの待機秒数を返す"""
+        with self._lock:
+            now = time.monotonic()
+            start_time = max(now, self._next_time)
+            self._next_time = start_time + self.interval
+        return start_time - now
+
+    def wait(self):
+        """次のリクエストを開始してよい時刻まで待機"""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire(self):
+        """次のリクエストを開始してよい時刻まで待機（asyncio用）"""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def update(self, headers: Mapping[str, str]):
+        """レスポンスヘッダーからサーバー指定の待機時間を反映"""
+        delay = self._parse_retry_after(headers.get('Retry-After'))
+        if delay is None and headers.get('X-RateLimit-Remaining') == '0':
+            delay = self._parse_reset(headers.get('X-RateLimit-Reset'))
+
+        if not delay or delay <= 0:
+            return
+
+        with self._lock:
+            self._next_time = max(self._next_time, time.monotonic() + min(delay, self.max_wait))
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Retry-After（秒数またはHTTP日付）を待機秒数に変換"""
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+    @staticmethod
+    def _parse_reset(value: Optional[str]) -> Optional[float]:
+        """X-RateLimit-Reset（残り秒数またはUNIX時刻）を待機秒数に変換"""
+        if not value:
+            return None
+        try:
+            reset = float(value)
+        except ValueError:
+            return None
+        # 十分大きい値はUNIX時刻とみなす
+        return reset - time.time() if reset > 1e9 else reset